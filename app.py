@@ -145,8 +145,17 @@ from shapely.geometry import mapping
 sys.path.append(os.path.join(os.path.dirname(__file__), "modules"))
 from modules import analysis, monitoring, weather_forecast, water_productivity
 from utils.readme_section import show_readme
+from utils import plot_utils, tracing
 from modules.rainfall import get_gpm_rainfall
-from utils.other_gee_layers import (get_worldcover, get_dem, get_roads_layer, get_rivers_layer, get_surface_water_layer, get_admin_layer)
+from utils.other_gee_layers import (get_worldcover, get_dem, get_admin_layer)
+from utils.tile_cache import add_ee_tile_layer
+from utils.rain_aggregates import HIST_WIDTH, default_store, error_bound
+from utils.zonal_stats import zonal_rainfall
+from utils.vector_lod import layer_geojson, lod_frame, lod_key, folium_bounds
+
+# Rainfall map: fixed initial view (the map is built once with it and never rebuilt on pan)
+RAINFALL_MAP_CENTER = [7.8, 80.7]
+RAINFALL_MAP_ZOOM = 8
 
 
 # ee.Authenticate()
@@ -262,41 +271,99 @@ if page == "Rainfall Distribution":
         wea_start_date = st.date_input("From", pd.to_datetime("2025-01-01"))
         wea_end_date = st.date_input("To", pd.to_datetime("2025-01-31"))
 
-        run_rainfall = st.button("Apply Layers")
+        # Approximate statistics only pay off with pre-aggregated blocks to read them from
+        exact_stats = True
+        if temporal_method != "Sum" and default_store() is not None:
+            exact_stats = st.checkbox("Exact statistics (slower)", value=True)
+            if exact_stats:
+                st.caption(f"{temporal_method} is computed over every half-hourly image.")
+            elif temporal_method == "Median":
+                st.caption(f"Median from {HIST_WIDTH:g} mm/hr histogram bins: within "
+                           f"±{error_bound('Median'):g} mm/hr of the exact value.")
+            else:
+                st.caption("Mean from pre-aggregated sums and counts: same as the exact value.")
+
+        if st.button("Apply Layers"):
+            st.session_state["rainfall_layer"] = (wea_start_date, wea_end_date, temporal_method, analysis_type, selected_name, exact_stats)
 
     # ---- Right Panel (Map) ----
     with col2:
-        Map = geemap.Map(center=[7.8, 80.7], zoom=8)
+        # The map itself never changes with the view, so st_folium keeps it mounted while panning.
+        # Vector layers are cut and simplified for the last view the map reported (st_folium keeps
+        # it in session_state under its key); they only change when the detail level or the
+        # snapped viewport cell does.
+        view = st.session_state.setdefault("rainfall_map_view", {"center": RAINFALL_MAP_CENTER, "zoom": RAINFALL_MAP_ZOOM, "bounds": None})
+        reported = st.session_state.get("rainfall_map") or {}
+        reported_bounds = folium_bounds(reported.get("bounds"))
+        if reported.get("zoom") is not None and reported_bounds is not None and \
+                lod_key(reported["zoom"], reported_bounds) != lod_key(view["zoom"], view["bounds"]):
+            west, south, east, north = reported_bounds
+            view = {"center": [(south + north) / 2, (west + east) / 2], "zoom": reported["zoom"], "bounds": reported_bounds}
+            st.session_state["rainfall_map_view"] = view
+        Map = geemap.Map(center=RAINFALL_MAP_CENTER, zoom=RAINFALL_MAP_ZOOM)
 
         # Static layers (load once)
         lulc, lulc_vis = get_worldcover()
         dem, dem_vis = get_dem()
-        roads_gdf = get_roads_layer(data_dir)
-        rivers_gdf = get_rivers_layer(data_dir)
-        surface_gdf = get_surface_water_layer(data_dir)
 
         # Add static base layers
-        Map.addLayer(dem, dem_vis, "SRTM DEM")
-        Map.addLayer(lulc, lulc_vis, "WorldCover LULC")
-
-        if roads_gdf is not None:
-            Map.add_gdf(roads_gdf, "Roads", color="black")
-        if rivers_gdf is not None:
-            Map.add_gdf(rivers_gdf, "Rivers", color="blue")
-        if surface_gdf is not None:
-            Map.add_gdf(surface_gdf, "Surface Water", color="cyan")
-
-        # Dynamic Rainfall
-        if run_rainfall:
-            rainfall_img, rainfall_vis = get_gpm_rainfall(wea_start_date, wea_end_date, temporal_method)
-            Map.addLayer(rainfall_img, rainfall_vis, f"GPM Rainfall ({temporal_method})")
-
-            aoi = gdf[gdf[filter_field] == selected_name]
-            Map.add_gdf(aoi, "Selected AOI", color=color)
-
-            st.success(f"Displaying {temporal_method} rainfall from {wea_start_date} to {wea_end_date} for {selected_name}")
+        # Tile URLs are cached per image graph, so reruns make no getMapId request
+        add_ee_tile_layer(Map, dem, dem_vis, "SRTM DEM")
+        add_ee_tile_layer(Map, lulc, lulc_vis, "WorldCover LULC")
+
+        # Vector layers: only the features in view, at the detail the zoom level can show.
+        # They reach the map as feature groups, which st_folium updates without a remount.
+        feature_groups = []
+        for layer_name, label, layer_color in [
+            ("lka_roads", "Roads", "black"),
+            ("lka_rivers", "Rivers", "blue"),
+            ("surface_water", "Surface Water", "cyan"),
+        ]:
+            geojson = layer_geojson(data_dir, layer_name, view["zoom"], view["bounds"])
+            if geojson is not None:
+                group = folium.FeatureGroup(name=label)
+                folium.GeoJson(geojson, style_function=lambda _, c=layer_color: {"color": c, "weight": 1}).add_to(group)
+                feature_groups.append(group)
+
+        # Dynamic Rainfall (kept across reruns triggered by panning/zooming)
+        rainfall_layer = st.session_state.get("rainfall_layer")
+        if rainfall_layer and rainfall_layer[3] == analysis_type:
+            rain_start, rain_end, rain_method, _, rain_name, rain_exact = rainfall_layer
+            rainfall_img, rainfall_vis = get_gpm_rainfall(rain_start, rain_end, rain_method, exact=rain_exact)
+            # Added as a feature group like the vectors: applying a new layer does not rebuild the map
+            group = folium.FeatureGroup(name=f"GPM Rainfall ({rain_method})")
+            add_ee_tile_layer(group, rainfall_img, rainfall_vis, group.layer_name)
+            feature_groups.append(group)
+
+            aoi = lod_frame(gdf[gdf[filter_field] == rain_name], view["zoom"])
+            group = folium.FeatureGroup(name="Selected AOI")
+            folium.GeoJson(aoi.to_json(drop_id=True), style_function=lambda _: {"color": color, "fill": False}).add_to(group)
+            feature_groups.append(group)
+
+            approx_note = "" if rain_exact or default_store() is None or not error_bound(rain_method) else \
+                f" (approximate: within ±{error_bound(rain_method):g} mm/hr of the exact value)"
+            st.success(f"Displaying {rain_method} rainfall from {rain_start} to {rain_end} for {rain_name}{approx_note}")
+
+        # center / zoom only move the mounted map (to the view it already shows), never rebuild it
+        st_folium(
+            Map,
+            key="rainfall_map",
+            height=600,
+            use_container_width=True,
+            center=view["center"],
+            zoom=view["zoom"],
+            returned_objects=["zoom", "bounds"],
+            feature_group_to_add=feature_groups,
+            layer_control=folium.LayerControl(),
+        )
 
-        Map.to_streamlit(height=600)
+        # Zonal statistics for every district / basin: one reduceRegions request, cached per date range
+        if rainfall_layer and rainfall_layer[3] == analysis_type:
+            zone_label = "District" if analysis_type == "Administrative" else "Basin"
+            with st.spinner(f"Computing rainfall statistics per {zone_label.lower()}..."):
+                zonal_df = zonal_rainfall(rain_start, rain_end, analysis_type, data_dir)
+            st.markdown(f"#### Rainfall by {zone_label} ({rain_start} to {rain_end})")
+            st.dataframe(zonal_df.rename_axis(zone_label).round(2), use_container_width=True)
 
 
 # ==============================
@@ -362,13 +429,20 @@ elif page == "Paddy Mapping":
 
         with st.sidebar.expander("Rice Mapping"):
             st.info("Select the Start, Peak, and Harvest dates. These will be used for further analysis.")
-            season_start_date = st.date_input("Start of Season", value=pd.to_datetime("2021-12-13"))
-            peak_date = st.date_input("Peak of Season", value=pd.to_datetime("2022-02-25"))
-            harvest_date = st.date_input("Harvest Date", value=pd.to_datetime("2022-04-01"))
+            # Defaults; "Apply detected season dates" (Time Series tab) replaces them with the detected ones
+            st.session_state.setdefault("season_start", pd.to_datetime("2021-12-13").date())
+            st.session_state.setdefault("season_peak", pd.to_datetime("2022-02-25").date())
+            st.session_state.setdefault("season_harvest", pd.to_datetime("2022-04-01").date())
+
+            season_start_date = st.date_input("Start of Season", key="season_start")
+            peak_date = st.date_input("Peak of Season", key="season_peak")
+            harvest_date = st.date_input("Harvest Date", key="season_harvest")
             run_paddy = st.button("Run Paddy Season Analysis")
 
         with st.sidebar.expander("Statistical Analysis"):
             st.info("Calculate total paddy area, area by month, and area by start date.")
+            cache_rasters = st.checkbox("Cache paddy rasters locally", value=False,
+                                        help="Download the paddy maps once and compute statistics locally on repeat runs.")
             run_stats = st.button("Run Statistical Analysis")
 
         params = {
@@ -379,13 +453,16 @@ elif page == "Paddy Mapping":
             "run_outlier": run_outlier,
             "run_paddy": run_paddy,
             "run_stats": run_stats,
+            "cache_rasters": cache_rasters,
             "season_dates": {
                 "start": str(season_start_date),
                 "peak": str(peak_date),
                 "harvest": str(harvest_date)
             }
         }
-        analysis.show(params)
+        with tracing.trace("Seasonal Analysis") as page_trace:
+            analysis.show(params)
+        plot_utils.show_trace_panel(page_trace)
 
     # SEASONAL MONITORING CONTROLS
     elif subpage == "Seasonal Monitoring":
@@ -401,15 +478,22 @@ elif page == "Paddy Mapping":
 
             start_date_mnt = st.date_input("Start Date", pd.to_datetime("2023-11-01"), key="start_tab2")
             end_date_mnt = st.date_input("End Date", pd.to_datetime("2024-01-31"), key="end_tab2")
+            interactive_mnt = st.checkbox(
+                "Interactive WebGL point charts", key="interactive_tab2",
+                help="Percentile bands per dekad and all point lines in one WebGL trace; fast with thousands of points."
+            )
             run_monitor = st.button("Run Analysis")
 
         params = {
             "aoi_mnt": aoi_option_mnt,
             "start_date_mnt": str(start_date_mnt),
             "end_date_mnt": str(end_date_mnt),
+            "interactive_mnt": interactive_mnt,
             "run_monitor": run_monitor
         }
-        monitoring.show(params)
+        with tracing.trace("Seasonal Monitoring") as page_trace:
+            monitoring.show(params)
+        plot_utils.show_trace_panel(page_trace)
 
     # ABOUT SECTION
     elif subpage == "Data and Methods":
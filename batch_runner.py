@@ -0,0 +1,250 @@
+"""
+Headless seasonal paddy analysis.
+
+Runs Time Series -> Outlier -> Rice Mapping -> Statistics for a list of jobs without Streamlit:
+
+    python batch_runner.py jobs.json --out results --workers 4
+
+jobs.json is a list of objects:
+
+    {"aoi": "Walawa Irrigation Scheme", "start_date": "2024-09-01", "end_date": "2025-03-31",
+     "season_dates": {"start": "2024-10-13", "peak": "2024-12-13", "harvest": "2025-02-13"},
+     "name": "uwis_maha_2024"}                   # name is optional; names must be unique
+
+"aoi" may also be a list of scheme names (utils.config.AOI_REGISTRY): the schemes then share
+one Sentinel-1 collection and set of dekad mosaics over their union bounds.
+
+Each job writes <out>/<name>/points.parquet (with a scheme column) and statistics.json
+(per-scheme results), then a _DONE marker.
+Jobs with a marker are skipped on the next run, so a failed batch can simply be restarted.
+
+Maintenance tasks (run once per project, instead of a jobs file):
+
+    python batch_runner.py --export-country-mask users/<you>/sri_lanka_mask
+
+starts the export of the rasterized Sri Lanka mask. Once the task has finished, set
+RICEWATER_COUNTRY_MASK_ASSET to that asset id: without it every map tile paints the national
+polygon again (utils.boundary.get_country_mask).
+
+    python batch_runner.py --materialize-rain 2001-01-01 2025-01-01
+
+starts exports of every month / dekad / day GPM rainfall block in the range that is not yet
+stored under RICEWATER_RAIN_AGGREGATES (utils.rain_aggregates); run it again for new months.
+
+Earth Engine credentials: EE_SERVICE_ACCOUNT_KEY (path to a service-account JSON key) if set,
+otherwise the default credentials from `earthengine authenticate` (EE_PROJECT selects the project).
+"""
+import os
+import re
+import json
+import math
+import logging
+import argparse
+import traceback
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import ee
+
+DONE_MARKER = "_DONE"
+
+logger = logging.getLogger("batch_runner")
+
+
+def init_earth_engine():
+    key_file = os.environ.get("EE_SERVICE_ACCOUNT_KEY")
+    if key_file:
+        with open(key_file) as f:
+            service_account = json.load(f)["client_email"]
+        ee.Initialize(ee.ServiceAccountCredentials(service_account, key_file=key_file))
+    else:
+        ee.Initialize(project=os.environ.get("EE_PROJECT"))
+
+
+def job_schemes(job):
+    return [job["aoi"]] if isinstance(job["aoi"], str) else list(job["aoi"])
+
+
+def job_name(job):
+    if job.get("name"):
+        return job["name"]
+    raw = f"{'+'.join(job_schemes(job))}_{job['start_date']}_{job['end_date']}"
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", raw).strip("_").lower()
+
+
+def json_number(value):
+    """float(value), or None for NaN (a threshold with no points behind it); JSON has no NaN."""
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+def run_job(job, job_dir):
+    """
+    Full analysis chain for one job; writes its outputs into job_dir.
+    All schemes of a job share one set of dekad mosaics built over their union bounds.
+    """
+    # Imported here so the parent process never needs Earth Engine initialized
+    import pandas as pd
+    from utils import gee_helpers, rice_algorithms
+    from utils.config import AOI_REGISTRY, pipeline_aoi
+
+    schemes = job_schemes(job)
+    start_date, end_date, dates = job["start_date"], job["end_date"], job["season_dates"]
+    shared_aoi = pipeline_aoi(schemes)
+
+    mosaicCollectionUInt16, filteredDekadList = gee_helpers.get_mosaic_collection(
+        aoi_path=shared_aoi, start_date=start_date, end_date=end_date
+    )
+
+    frames, results = [], {}
+    for scheme in schemes:
+        aoi_path = AOI_REGISTRY[scheme]["aoi"]
+        aoi = ee.FeatureCollection(aoi_path).geometry()
+
+        df_line, df_points = gee_helpers.get_time_series(
+            aoi_path=aoi_path, start_date=start_date, end_date=end_date, mosaic_aoi=shared_aoi
+        )
+        outlier_params = rice_algorithms.detect_outliers(df_points, dates)
+
+        maskedPaddyClassification, _, _, maskedStartMonthDay = rice_algorithms.perform_rice_mapping(
+            aoi=aoi,
+            mosaicCollectionUInt16=mosaicCollectionUInt16,
+            filteredDekadList=filteredDekadList,
+            outlier_params=outlier_params,
+            dates=dates,
+            streak_method=rice_algorithms.streak_method_for(start_date, end_date),
+            scheme=scheme,
+        )
+        total_area_ha, month_stats, mmdd_stats = gee_helpers.compute_statistics(
+            aoi, maskedPaddyClassification, maskedStartMonthDay
+        )
+
+        frames.append(df_line.assign(scheme=scheme))
+        results[scheme] = {
+            "outlier_params": {k: json_number(v) for k, v in outlier_params.items()},
+            "total_area_ha": total_area_ha,
+            "month_stats": {str(k): v for k, v in sorted(month_stats.items())},
+            "mmdd_stats": {str(k): v for k, v in sorted(mmdd_stats.items())},
+        }
+
+    os.makedirs(job_dir, exist_ok=True)
+    pd.concat(frames, ignore_index=True).to_parquet(os.path.join(job_dir, "points.parquet"), index=False)
+    with open(os.path.join(job_dir, "statistics.json"), "w") as f:
+        json.dump({"job": job, "schemes": results}, f, indent=2, allow_nan=False)
+
+    # Written last: its presence means every output above is complete
+    open(os.path.join(job_dir, DONE_MARKER), "w").close()
+    return sum(r["total_area_ha"] for r in results.values())
+
+
+def _worker(job, job_dir):
+    try:
+        return run_job(job, job_dir), None
+    except Exception:
+        return None, traceback.format_exc()
+
+
+def run_batch(jobs, out_dir, workers=2, force=False):
+    """
+    Run jobs in a process pool; returns {job name: error traceback} for the ones that failed.
+    Raises ValueError if two jobs share a name (they would write to the same directory).
+    """
+    duplicates = sorted(name for name, n in Counter(job_name(job) for job in jobs).items() if n > 1)
+    if duplicates:
+        raise ValueError(f"duplicate job names: {', '.join(duplicates)}")
+
+    pending = {}
+    for job in jobs:
+        job_dir = os.path.join(out_dir, job_name(job))
+        if not force and os.path.exists(os.path.join(job_dir, DONE_MARKER)):
+            logger.info("skip %s (done)", job_name(job))
+            continue
+        pending[job_name(job)] = (job, job_dir)
+
+    failures = {}
+    # spawn: every worker starts clean and initializes its own Earth Engine session
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_earth_engine) as pool:
+        futures = {pool.submit(_worker, job, job_dir): name for name, (job, job_dir) in pending.items()}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                total_area_ha, error = future.result()
+            except Exception:
+                total_area_ha, error = None, traceback.format_exc()
+
+            if error:
+                failures[name] = error
+                logger.error("failed %s\n%s", name, error)
+                os.makedirs(pending[name][1], exist_ok=True)
+                with open(os.path.join(pending[name][1], "error.log"), "w") as f:
+                    f.write(error)
+            else:
+                logger.info("done %s: %.2f ha", name, total_area_ha)
+    return failures
+
+
+def export_country_mask(asset_id):
+    """Start the country mask export and return its task id."""
+    from utils import boundary
+
+    task = boundary.export_country_mask(asset_id)
+    logger.info("started export %s to %s; set RICEWATER_COUNTRY_MASK_ASSET=%s once it has finished",
+                task.id, asset_id, asset_id)
+    return task.id
+
+
+def materialize_rain(start_date, end_date):
+    """Start exports of the missing rainfall blocks in [start_date, end_date); returns how many."""
+    from utils import rain_aggregates
+
+    store = rain_aggregates.default_store()
+    if store is None:
+        raise ValueError("RICEWATER_RAIN_AGGREGATES is not set")
+    written = rain_aggregates.materialize(store, start_date, end_date)
+    logger.info("started %d block exports under %s", len(written), store.root)
+    return len(written)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run seasonal paddy analysis jobs without the Streamlit app.")
+    parser.add_argument("jobs", nargs="?", help="JSON file with a list of jobs")
+    parser.add_argument("--out", default="batch_results", help="output directory (default: batch_results)")
+    parser.add_argument("--workers", type=int, default=2, help="worker processes (default: 2)")
+    parser.add_argument("--force", action="store_true", help="re-run jobs that already finished")
+    parser.add_argument("--export-country-mask", metavar="ASSET_ID",
+                        help="start the Sri Lanka mask export to ASSET_ID instead of running jobs")
+    parser.add_argument("--materialize-rain", nargs=2, metavar=("START", "END"),
+                        help="start exports of the missing rainfall blocks in [START, END) instead of running jobs")
+    args = parser.parse_args(argv)
+
+    if args.export_country_mask or args.materialize_rain:
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+        init_earth_engine()
+        if args.export_country_mask:
+            export_country_mask(args.export_country_mask)
+        if args.materialize_rain:
+            materialize_rain(*args.materialize_rain)
+        return 0
+    if not args.jobs:
+        parser.error("a jobs file is required")
+
+    os.makedirs(args.out, exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(message)s",
+        handlers=[logging.StreamHandler(), logging.FileHandler(os.path.join(args.out, "batch.log"))],
+    )
+
+    with open(args.jobs) as f:
+        jobs = json.load(f)
+
+    failures = run_batch(jobs, args.out, workers=args.workers, force=args.force)
+    if failures:
+        logger.error("%d of %d jobs failed: %s", len(failures), len(jobs), ", ".join(sorted(failures)))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,238 @@
+"""
+Size of the Earth Engine request graphs built by the pipeline, as a regression guard.
+
+For a range of season lengths this serializes the graphs of
+
+    mosaic_collection   gee_helpers.get_mosaic_collection
+    rice_mapping        rice_algorithms.perform_rice_mapping (all four output images)
+    monitoring          modules.monitoring.build_paddy_images
+
+and reports their node count, depth and serialized size in bytes. The numbers are compared
+with benchmarks/graph_baseline.json; any that grew past it fail the run:
+
+    python -m benchmarks.graph_metrics                     # check against the baseline
+    python -m benchmarks.graph_metrics --update-baseline   # accept the current numbers
+
+A missing baseline is only reported, unless --require-baseline is given (the default when the
+CI environment variable is set): then it fails the run, so the guard cannot pass vacuously.
+
+Building graphs needs no requests beyond the algorithm list, so it runs offline on the list
+bundled with earthengine-api (utils.ee_cassette.offline_entries); --cassette replays the one
+of a recording instead (see benchmarks.run_benchmarks) and --live asks Earth Engine.
+
+The baseline is committed. After a change that grows a graph on purpose, refresh it with
+--update-baseline and commit the new file with the change.
+"""
+import os
+import sys
+import json
+import argparse
+from datetime import date
+import pandas as pd
+
+from utils import ee_cassette
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "graph_baseline.json")
+
+SCHEME = "Walawa Irrigation Scheme"
+SEASON_START = date(2021, 11, 1)
+# Season lengths (months) to measure; long ones switch streak_method_for to the array streak
+SEASON_MONTHS = (3, 6, 9, 12)
+METRICS = ("nodes", "depth", "bytes")
+
+# Values carried by graph nodes (google.earthengine.v1 ValueNode fields)
+_NODE_FIELDS = {
+    "constantValue", "integerValue", "bytesValue", "arrayValue", "dictionaryValue",
+    "functionDefinitionValue", "functionInvocationValue", "argumentReference", "valueReference",
+}
+
+
+# ---------------- Metrics ----------------
+def _count_nodes(value):
+    if isinstance(value, dict):
+        own = 1 if value.keys() & _NODE_FIELDS else 0
+        return own + sum(_count_nodes(v) for v in value.values())
+    if isinstance(value, list):
+        return sum(_count_nodes(v) for v in value)
+    return 0
+
+
+def _depth(value, values, memo):
+    """Longest chain of nested nodes, following references into the shared values table."""
+    if isinstance(value, dict):
+        if "valueReference" in value:
+            ref = value["valueReference"]
+            if ref not in memo:
+                memo[ref] = _depth(values[ref], values, memo)
+            return memo[ref]
+        children = list(value.values())
+        if "functionDefinitionValue" in value:
+            # A function body is the bare name of its node in the values table
+            children = [{"valueReference": value["functionDefinitionValue"]["body"]}]
+    elif isinstance(value, list):
+        children = value
+    else:
+        return 0
+    deepest = max((_depth(v, values, memo) for v in children), default=0)
+    return deepest + (1 if isinstance(value, dict) and value.keys() & _NODE_FIELDS else 0)
+
+
+def graph_metrics(obj):
+    """Node count, depth and byte size of obj's serialized (deduplicated) request graph."""
+    from ee import serializer
+
+    encoded = serializer.encode(obj, for_cloud_api=True)
+    values = encoded.get("values", {})
+    return {
+        "nodes": _count_nodes(values),
+        "depth": _depth({"valueReference": encoded["result"]}, values, {}),
+        "bytes": len(json.dumps(encoded, separators=(",", ":"))),
+    }
+
+
+# ---------------- Graphs ----------------
+def season(months):
+    """(start, end, season dates) of a season of the given length starting at SEASON_START."""
+    from utils.dekad_pipeline import dekad_dates
+
+    start = SEASON_START
+    end = (pd.Timestamp(start) + pd.DateOffset(months=months)).date()
+    # Season dates fall on dekad starts, at fixed fractions of the season
+    dekads = dekad_dates(start, end)
+    dates = {k: pd.Timestamp(dekads[int(f * (len(dekads) - 1))]) for k, f in (("start", 0.1), ("peak", 0.5), ("harvest", 0.8))}
+    return start.isoformat(), end.isoformat(), dates
+
+
+def build_graphs(months):
+    """{graph name: ee object} for one season length."""
+    import ee
+    from utils import gee_helpers, rice_algorithms
+    from utils.config import AOI_REGISTRY, load_assets
+    from modules.monitoring import build_paddy_images
+
+    start_date, end_date, dates = season(months)
+    aoi_path = AOI_REGISTRY[SCHEME]["aoi"]
+    aoi = ee.FeatureCollection(aoi_path).geometry()
+    mosaicCollectionUInt16, filteredDekadList = gee_helpers.get_mosaic_collection(aoi_path, start_date, end_date)
+    streak_method = rice_algorithms.streak_method_for(start_date, end_date)
+
+    # Threshold values only appear as constants; their magnitude does not change the graph
+    outlier_params = {"diff_start_peak": 2000.0, "diff_peak_harvest": 1500.0, "q3_start": 3000.0, "q1_peak": 5000.0}
+    rice_outputs = rice_algorithms.perform_rice_mapping(
+        aoi=aoi,
+        mosaicCollectionUInt16=mosaicCollectionUInt16,
+        filteredDekadList=filteredDekadList,
+        outlier_params=outlier_params,
+        dates={k: v.date().isoformat() for k, v in dates.items()},
+        streak_method=streak_method,
+        scheme=SCHEME,
+    )
+
+    assets = load_assets(SCHEME)
+    thresholds = {
+        "start_date": pd.Timestamp(start_date), "sos_date": dates["start"], "peak_date": dates["peak"],
+        "q3_sos": 3000.0, "q1_peak": 5000.0, "diff_start_sos": 1500.0, "diff_sos_peak": 2000.0,
+    }
+    monitoring_outputs = build_paddy_images(
+        aoi, mosaicCollectionUInt16, filteredDekadList, assets["water"], assets["roads"], thresholds,
+        start_date, end_date,
+    )
+
+    return {
+        "mosaic_collection": mosaicCollectionUInt16,
+        "rice_mapping": ee.List(list(rice_outputs)),
+        "monitoring": ee.List(list(monitoring_outputs)),
+    }
+
+
+def collect(season_months=SEASON_MONTHS):
+    """{"<graph>/<months>m": {nodes, depth, bytes}} for every graph and season length."""
+    # Deep graphs (iterate, nested If) exceed the default limit in the recursive walks above
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 20000))
+    results = {}
+    for months in season_months:
+        for name, obj in build_graphs(months).items():
+            results[f"{name}/{months}m"] = graph_metrics(obj)
+    return results
+
+
+# ---------------- Baseline ----------------
+def compare(results, baseline, tolerance=0.0):
+    """Regressions as (key, metric, baseline value, current value) for metrics that grew past baseline."""
+    regressions = []
+    for key, metrics in results.items():
+        stored = baseline.get(key)
+        if stored is None:
+            continue
+        for metric in METRICS:
+            if metrics[metric] > stored[metric] * (1 + tolerance):
+                regressions.append((key, metric, stored[metric], metrics[metric]))
+    return regressions
+
+
+def load_baseline(path=DEFAULT_BASELINE):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results, path=DEFAULT_BASELINE):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def require_baseline_default():
+    """Fail on a missing baseline in CI (CI set to anything but "", "0" or "false")."""
+    return os.environ.get("CI", "").lower() not in ("", "0", "false")
+
+
+def check(results, baseline_path=DEFAULT_BASELINE, tolerance=0.0, require_baseline=False):
+    """Print the metrics table and regressions; returns the process exit code."""
+    baseline = load_baseline(baseline_path)
+    print(f"{'graph':<26}{'nodes':>9}{'depth':>8}{'bytes':>11}{'vs baseline':>14}")
+    for key, m in results.items():
+        stored = (baseline or {}).get(key)
+        delta = f"{m['bytes'] - stored['bytes']:+d} B" if stored else "new"
+        print(f"{key:<26}{m['nodes']:>9}{m['depth']:>8}{m['bytes']:>11}{delta:>14}")
+
+    if baseline is None:
+        print(f"no baseline at {baseline_path}; store one with --update-baseline", file=sys.stderr)
+        return 1 if require_baseline else 0
+    regressions = compare(results, baseline, tolerance)
+    for key, metric, before, after in regressions:
+        print(f"REGRESSION {key} {metric}: {before} -> {after}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report EE graph sizes and fail when they grow past the baseline.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help=f"baseline JSON (default: {DEFAULT_BASELINE})")
+    parser.add_argument("--update-baseline", action="store_true", help="write the current numbers as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.0, help="allowed relative growth (default: 0)")
+    parser.add_argument("--months", type=int, nargs="+", default=list(SEASON_MONTHS), help="season lengths in months")
+    parser.add_argument("--cassette", help="replay the algorithm list of this recording (default: the bundled one)")
+    parser.add_argument("--live", action="store_true", help="initialize Earth Engine with credentials instead")
+    parser.add_argument("--require-baseline", action=argparse.BooleanOptionalAction, default=require_baseline_default(),
+                        help="fail when the baseline is missing (default: on when CI is set)")
+    args = parser.parse_args(argv)
+
+    if args.live:
+        from batch_runner import init_earth_engine
+        init_earth_engine()
+        results = collect(args.months)
+    else:
+        with ee_cassette.Cassette(args.cassette, mode="replay"):
+            results = collect(args.months)
+
+    if args.update_baseline:
+        save_baseline(results, args.baseline)
+        print(f"baseline written to {args.baseline}")
+        return 0
+    return check(results, args.baseline, args.tolerance, args.require_baseline)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
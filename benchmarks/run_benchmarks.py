@@ -0,0 +1,183 @@
+"""
+Client-side benchmarks of the paddy pipeline against recorded Earth Engine responses.
+
+Record the cassette once, with Earth Engine credentials (see batch_runner.init_earth_engine):
+
+    python -m benchmarks.run_benchmarks --record
+
+Then replay it offline, as often as needed:
+
+    python -m benchmarks.run_benchmarks [--json results.json]
+
+Without a recording the scenarios are skipped and only the graph size check below runs, on
+the algorithm list bundled with earthengine-api (utils.ee_cassette.offline_entries).
+
+Scenarios run in order and share state like the app does (Rice Mapping uses the
+Time Series points):
+
+    time_series    gee_helpers.get_time_series
+    rice_mapping   detect_outliers + perform_rice_mapping + compute_statistics
+    monitoring     modules.monitoring.show (Streamlit calls run headless)
+
+Each scenario reports process CPU time (all threads, including ee_executor workers),
+wall time, peak traced memory and the Earth Engine requests it made per call.
+CPU times include tracemalloc overhead; compare them only between runs of this suite.
+
+The run then checks the request graph sizes against the stored baseline
+(benchmarks.graph_metrics) and exits with status 1 if any of them grew, or if the baseline
+is missing and --require-baseline is on (the default when CI is set).
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+import tracemalloc
+from collections import Counter
+
+# Every run starts with empty on-disk caches so the request sequence matches the recording
+os.environ["RICEWATER_CACHE_DIR"] = tempfile.mkdtemp(prefix="ricewater-bench-")
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+from utils import ee_cassette  # noqa: E402
+from benchmarks import graph_metrics  # noqa: E402
+
+DEFAULT_CASSETTE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cassettes", "pipeline.json.gz")
+
+# Fixed past dates (app defaults): every dekad is settled, so the requests are deterministic
+SCHEME = "Walawa Irrigation Scheme"
+START_DATE, END_DATE = "2021-12-01", "2022-05-31"
+SEASON_DATES = {"start": "2021-12-13", "peak": "2022-02-25", "harvest": "2022-04-01"}
+MONITORING_PARAMS = {
+    "aoi_mnt": SCHEME,
+    "start_date_mnt": "2023-11-01",
+    "end_date_mnt": "2024-01-31",
+    "run_monitor": True,
+}
+
+
+# ---------------- Scenarios ----------------
+def bench_time_series(state):
+    from utils import gee_helpers
+    from utils.config import AOI_REGISTRY
+
+    _, df_points = gee_helpers.get_time_series(
+        aoi_path=AOI_REGISTRY[SCHEME]["aoi"], start_date=START_DATE, end_date=END_DATE
+    )
+    state["df_points"] = df_points
+
+
+def bench_rice_mapping(state):
+    import ee
+    from utils import gee_helpers, rice_algorithms
+    from utils.config import AOI_REGISTRY
+
+    aoi_path = AOI_REGISTRY[SCHEME]["aoi"]
+    aoi = ee.FeatureCollection(aoi_path).geometry()
+    mosaicCollectionUInt16, filteredDekadList = gee_helpers.get_mosaic_collection(
+        aoi_path=aoi_path, start_date=START_DATE, end_date=END_DATE
+    )
+    outlier_params = rice_algorithms.detect_outliers(state["df_points"], SEASON_DATES)
+    maskedPaddyClassification, _, _, maskedStartMonthDay = rice_algorithms.perform_rice_mapping(
+        aoi=aoi,
+        mosaicCollectionUInt16=mosaicCollectionUInt16,
+        filteredDekadList=filteredDekadList,
+        outlier_params=outlier_params,
+        dates=SEASON_DATES,
+        streak_method=rice_algorithms.streak_method_for(START_DATE, END_DATE),
+        scheme=SCHEME,
+    )
+    gee_helpers.compute_statistics(aoi, maskedPaddyClassification, maskedStartMonthDay)
+
+
+def bench_monitoring(state):
+    import matplotlib.pyplot as plt
+    from modules import monitoring
+
+    monitoring.show(dict(MONITORING_PARAMS))
+    plt.close("all")
+
+
+SCENARIOS = {
+    "time_series": bench_time_series,
+    "rice_mapping": bench_rice_mapping,
+    "monitoring": bench_monitoring,
+}
+
+
+# ---------------- Runner ----------------
+def measure(fn, state, cassette):
+    """Run one scenario; returns its CPU and wall time, peak memory and request counts."""
+    before = Counter(cassette.counts)
+    tracemalloc.start()
+    cpu, wall = time.process_time(), time.perf_counter()
+    try:
+        fn(state)
+        cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    requests = cassette.counts - before
+    return {
+        "cpu_s": round(cpu, 3),
+        "wall_s": round(wall, 3),
+        "peak_mib": round(peak / 2 ** 20, 2),
+        "requests": dict(sorted(requests.items())),
+        "total_requests": sum(requests.values()),
+    }
+
+
+def run(cassette_path, record=False, scenarios=tuple(SCENARIOS)):
+    if record:
+        from batch_runner import init_earth_engine
+        init_earth_engine()
+        os.makedirs(os.path.dirname(cassette_path), exist_ok=True)
+
+    results, state = {}, {}
+    with ee_cassette.Cassette(cassette_path, mode="record" if record else "replay") as cassette:
+        for name in scenarios:
+            results[name] = measure(SCENARIOS[name], state, cassette)
+        graphs = graph_metrics.collect()
+    return results, graphs
+
+
+def print_table(results):
+    print(f"{'scenario':<14}{'cpu s':>9}{'wall s':>9}{'peak MiB':>10}{'requests':>10}  per call")
+    for name, r in results.items():
+        calls = ", ".join(f"{call}={n}" for call, n in r["requests"].items())
+        print(f"{name:<14}{r['cpu_s']:>9.3f}{r['wall_s']:>9.3f}{r['peak_mib']:>10.2f}{r['total_requests']:>10}  {calls}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline client side against recorded EE responses.")
+    parser.add_argument("--cassette", default=DEFAULT_CASSETTE, help=f"cassette file (default: {DEFAULT_CASSETTE})")
+    parser.add_argument("--record", action="store_true", help="call Earth Engine and (re)write the cassette")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    parser.add_argument("--baseline", default=graph_metrics.DEFAULT_BASELINE, help="graph size baseline JSON")
+    parser.add_argument("--require-baseline", action=argparse.BooleanOptionalAction,
+                        default=graph_metrics.require_baseline_default(),
+                        help="fail when the graph baseline is missing (default: on when CI is set)")
+    args = parser.parse_args(argv)
+
+    # Headless Streamlit warns on every call made outside `streamlit run`
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    if args.record or os.path.exists(args.cassette):
+        results, graphs = run(args.cassette, record=args.record)
+    else:
+        print(f"{args.cassette} not found; scenarios skipped (record them with --record)", file=sys.stderr)
+        with ee_cassette.Cassette():
+            results, graphs = {}, graph_metrics.collect()
+    print_table(results)
+    print()
+    status = graph_metrics.check(graphs, args.baseline, require_baseline=args.require_baseline)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"scenarios": results, "graphs": graphs}, f, indent=2)
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,12 +1,19 @@
 import streamlit as st
 import ee
 import geemap.foliumap as geemap
-from utils import gee_helpers, plot_utils, rice_algorithms
+from utils import chart_service, ee_executor, gee_helpers, phenology, plot_utils, raster_cache, rice_algorithms
 from utils.config import AOI_OPTIONS
 import geemap.foliumap as geemap
 from streamlit_folium import folium_static
 
 
+def apply_detected_season_dates():
+    """Button callback: runs before the sidebar date inputs are drawn, so it may set their keys."""
+    detected = st.session_state["phenology"]
+    for stage in phenology.STAGES:
+        st.session_state[f"season_{stage}"] = detected[stage]["date"].date()
+
+
 def show(params):
     st.title("Seasonal Analysis")
 
@@ -26,7 +33,7 @@ def show(params):
             with st.spinner(f"Running Time Series Analysis for {params['aoi']} "
                             f"({params['start_date']} → {params['end_date']})..."):
                 df_line, df_points = gee_helpers.get_time_series(
-                    aoi=aoi,
+                    aoi_path=aoi_path,
                     start_date=params["start_date"],
                     end_date=params["end_date"]
                 )
@@ -34,6 +41,13 @@ def show(params):
                     "ts_df_line": df_line,
                     "ts_df_points": df_points
                 })
+
+            # Season dates detected from the points; the user applies them to Rice Mapping explicitly
+            if df_points.empty:
+                st.session_state.pop("phenology", None)
+            else:
+                _, consensus = phenology.detect(df_points)
+                st.session_state["phenology"] = consensus
         else:
             st.markdown(
                 "<span style='font-size:16px; color:gray;'>"
@@ -44,8 +58,24 @@ def show(params):
 
         # Always (re)draw plots if data exists
         if "ts_df_line" in st.session_state and "ts_df_points" in st.session_state:
-            plot_utils.plot_time_series(st.session_state["ts_df_line"])
-            plot_utils.plot_point_series(st.session_state["ts_df_points"])
+            interactive = st.toggle(
+                "Interactive WebGL charts",
+                value=st.session_state["ts_df_points"]["point_id"].nunique() > plot_utils.MAX_VISIBLE_LINES,
+                key="ts_interactive",
+                help="Percentile bands per dekad and all point lines in one WebGL trace; fast with thousands of points.",
+            )
+            plot_utils.plot_time_series(st.session_state["ts_df_line"], interactive=interactive)
+            plot_utils.plot_point_series(st.session_state["ts_df_points"], interactive=interactive)
+
+        if "phenology" in st.session_state:
+            detected = st.session_state["phenology"]
+            st.caption(
+                f"Season detected from {detected['peak']['points']} sample points: "
+                + ", ".join(f"{stage} {detected[stage]['date']:%Y-%m-%d} (IQR {detected[stage]['iqr_days']:.0f} days)"
+                            for stage in phenology.STAGES)
+            )
+            st.button("Apply detected season dates", on_click=apply_detected_season_dates,
+                      help="Replace the Rice Mapping season dates with the detected ones.")
 
 
     with tab2:
@@ -54,11 +84,11 @@ def show(params):
                 st.error("Please run the Time Series Analysis first.")
             else:
                 with st.spinner("Running Outlier Analysis..."):
-                    # Create and save the boxplot figure
-                    fig_box = plot_utils.plot_outlier_boxplot(st.session_state["ts_df_points"])
-                    st.session_state["outlier_boxplot"] = fig_box
+                    # Render and keep the boxplot image
+                    box_png = plot_utils.plot_outlier_boxplot(st.session_state["ts_df_points"])
+                    st.session_state["outlier_boxplot"] = box_png
                     st.subheader("mRVI Dispersion and Outlier Analysis at Sample Points")
-                    st.pyplot(fig_box)
+                    chart_service.show(box_png)
 
         else:
             st.markdown(
@@ -71,7 +101,7 @@ def show(params):
         # Re-display previously generated plot (without recomputing)
         if "outlier_boxplot" in st.session_state and not params["run_outlier"]:
             st.subheader("mRVI Dispersion and Outlier Analysis at Sample Points")
-            st.pyplot(st.session_state["outlier_boxplot"])
+            chart_service.show(st.session_state["outlier_boxplot"])
 
 
     with tab3:
@@ -83,13 +113,16 @@ def show(params):
                     st.error("Please run Time Series and Outlier Analysis first.")
                 else:
                     # Retrieve the necessary data
+                    # Centroid request runs while the mapping graph is built
+                    centroid_future = ee_executor.get_info_async(aoi.centroid().coordinates())
+
                     df_points = st.session_state["ts_df_points"]
                     dates = params["season_dates"]
                     outlier_params = rice_algorithms.detect_outliers(df_points, dates)
 
-                    # Get mosaic & dekad list (from gee_helpers)
+                    # Get mosaic & dekad list (shared with the Time Series Analysis run)
                     mosaicCollectionUInt16, filteredDekadList = gee_helpers.get_mosaic_collection(
-                        aoi=aoi,
+                        aoi_path=aoi_path,
                         start_date=params["start_date"],
                         end_date=params["end_date"]
                     )
@@ -99,14 +132,16 @@ def show(params):
                         mosaicCollectionUInt16=mosaicCollectionUInt16,
                         filteredDekadList=filteredDekadList,
                         outlier_params=outlier_params,
-                        dates=dates
+                        dates=dates,
+                        streak_method=rice_algorithms.streak_method_for(params["start_date"], params["end_date"]),
+                        scheme=aoi_name
                     )
 
                     st.session_state["maskedPaddyClassification"] = maskedPaddyClassification
                     st.session_state["maskedStartMonth"] = maskedStartMonth
                     st.session_state["maskedStartMonthDay"] = maskedStartMonthDay
 
-                    aoi_centroid = aoi.centroid().coordinates().getInfo()
+                    aoi_centroid = ee_executor.gather(centroid_future)
                     Map_SA = geemap.Map(center=[aoi_centroid[1], aoi_centroid[0]], zoom=12)
                     Map_SA.add_basemap("SATELLITE")
                     
@@ -161,10 +196,18 @@ def show(params):
                     maskedStartMonth = st.session_state["maskedStartMonth"]
                     maskedStartMonthDay = st.session_state["maskedStartMonthDay"]
 
-                    # Compute statistics from GEE
-                    total_area_ha, month_stats, mmdd_stats = gee_helpers.compute_statistics(
-                        aoi, maskedPaddyClassification, maskedStartMonth, maskedStartMonthDay
-                    )
+                    if params.get("cache_rasters"):
+                        # Download the paddy rasters once, then compute statistics locally
+                        raster_path = raster_cache.export_paddy_rasters(
+                            aoi, maskedPaddyClassification, maskedStartMonth, maskedStartMonthDay,
+                            end_date=params["end_date"],
+                        )
+                        total_area_ha, month_stats, mmdd_stats = raster_cache.local_statistics(raster_path)
+                    else:
+                        # Compute statistics from GEE
+                        total_area_ha, month_stats, mmdd_stats = gee_helpers.compute_statistics(
+                            aoi, maskedPaddyClassification, maskedStartMonthDay
+                        )
 
                     # Display total area
                     st.subheader(f"🌾 Total Paddy Extent: {total_area_ha:,.2f} ha")
@@ -190,28 +233,28 @@ def show(params):
             with col1:
                 if "stats_combo_month" in st.session_state:
                     st.subheader("Monthly & Cumulative Paddy Area")
-                    st.pyplot(st.session_state["stats_combo_month"])
+                    chart_service.show(st.session_state["stats_combo_month"])
             with col2:
                 if "stats_combo_day" in st.session_state:
                     st.subheader("Dekadal & Cumulative Paddy Area")
-                    st.pyplot(st.session_state["stats_combo_day"])
+                    chart_service.show(st.session_state["stats_combo_day"])
 
             col3, col4 = st.columns(2)
             with col3:
                 if "stats_bar_month" in st.session_state:
                     st.subheader("Paddy Area by Month")
-                    st.pyplot(st.session_state["stats_bar_month"])
+                    chart_service.show(st.session_state["stats_bar_month"])
             with col4:
                 if "stats_bar_day" in st.session_state:
                     st.subheader("Paddy Area by Start Date (MM-DD)")
-                    st.pyplot(st.session_state["stats_bar_day"])
+                    chart_service.show(st.session_state["stats_bar_day"])
 
             col5, col6 = st.columns(2)
             with col5:
                 if "stats_pie_month" in st.session_state:
                     st.subheader("Paddy Area Percentage by Month")
-                    st.pyplot(st.session_state["stats_pie_month"])
+                    chart_service.show(st.session_state["stats_pie_month"])
             with col6:
                 if "stats_pie_day" in st.session_state:
                     st.subheader("Paddy Area Percentage by Start Date (MM-DD)")
-                    st.pyplot(st.session_state["stats_pie_day"])
+                    chart_service.show(st.session_state["stats_pie_day"])
@@ -1,14 +1,31 @@
 import ee
+from utils.boundary import mask_to_country
+from utils import rain_aggregates
 
-def get_sri_lanka_geometry():
-    """Return Sri Lanka boundary as ee.Geometry."""
-    return ee.FeatureCollection("FAO/GAUL_SIMPLIFIED_500m/2015") \
-        .filter(ee.Filter.eq("ADM0_NAME", "Sri Lanka")) \
-        .geometry()
 
+def get_gpm_rainfall(start_date, end_date, aggregation="Sum", store=None, exact=True):
+    """
+    Fetch and aggregate GPM IMERG rainfall.
+    Sums are built from month/dekad/day pre-aggregates when a store is given (or configured).
+    With exact=False and a store, Mean and Median come from the stored sums, counts and
+    histograms instead of every image (see rain_aggregates.error_bound); without a store
+    the exact reducers are used, as the blocks would be reduced from raw images anyway.
+    """
+    vis_params = {"min": 0, "max": 300, "palette": ["white", "lightblue", "blue", "darkblue"]}
+
+    store = store or rain_aggregates.default_store()
+    if not exact and store is not None and aggregation in ("Mean", "Median"):
+        aggregated = rain_aggregates.aggregate(start_date, end_date, store, histogram=aggregation == "Median")
+        if aggregation == "Mean":
+            image = rain_aggregates.mean_image(aggregated)
+        else:
+            image = rain_aggregates.median_image(aggregated)
+        return mask_to_country(image), vis_params
+
+    if aggregation == "Sum" and store is not None:
+        image = rain_aggregates.aggregate(start_date, end_date, store).select("sum").rename("precipitation")
+        return mask_to_country(image), vis_params
 
-def get_gpm_rainfall(start_date, end_date, aggregation="Sum"):
-    """Fetch and aggregate GPM IMERG rainfall."""
     dataset = ee.ImageCollection("NASA/GPM_L3/IMERG_V07") \
         .filterDate(start_date, end_date) \
         .select("precipitation")
@@ -22,5 +39,4 @@ def get_gpm_rainfall(start_date, end_date, aggregation="Sum"):
     else:
         image = dataset.sum()
 
-    vis_params = {"min": 0, "max": 300, "palette": ["white", "lightblue", "blue", "darkblue"]}
-    return image.clip(get_sri_lanka_geometry()), vis_params
+    return mask_to_country(image), vis_params
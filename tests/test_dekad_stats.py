@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+from utils.dekad_stats import DekadStats
+from utils.rice_algorithms import detect_outliers
+
+DATES = {"start": "2024-01-01", "peak": "2024-01-13", "harvest": "2024-01-25"}
+
+
+def points_frame():
+    return pd.DataFrame({
+        "time": pd.to_datetime(["2024-01-01"] * 4 + ["2024-01-13"] * 4),
+        "point_id": list("abcd") * 2,
+        "mRVI_median": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0],
+    })
+
+
+def test_empty_points_give_nan_thresholds():
+    empty = pd.DataFrame(columns=["time", "point_id", "mRVI_median"])
+
+    params = detect_outliers(empty, DATES)
+    assert all(np.isnan(v) for v in params.values())
+
+    sweep = DekadStats(empty).sweep([DATES["start"]], [DATES["peak"]], [DATES["harvest"]])
+    assert len(sweep) == 1
+    assert sweep.drop(columns=["start", "peak", "harvest"]).isna().all(axis=None)
+
+
+def test_thresholds_match_direct_selection():
+    df = points_frame()
+    params = DekadStats(df).outlier_params(DATES["start"], DATES["peak"], DATES["harvest"])
+
+    start = df.loc[df["time"] == DATES["start"], "mRVI_median"]
+    peak = df.loc[df["time"] == DATES["peak"], "mRVI_median"]
+    assert params["q3_start"] == start.quantile(0.75)
+    assert params["q1_peak"] == peak.quantile(0.25)
+    assert params["diff_start_peak"] == peak.mean() - start.mean()
+    # No points on the harvest dekad
+    assert np.isnan(params["mean_harvest"])
@@ -0,0 +1,78 @@
+from collections import Counter
+import ee
+import numpy as np
+import pytest
+from ee import apitestcase
+from utils import ee_cassette
+from utils.ee_cassette import Cassette, CassetteMiss
+
+MAP_ID = "projects/test/maps/abc"
+TILE_URL = f"https://earthengine.googleapis.com/v1/{MAP_ID}/tiles/{{z}}/{{x}}/{{y}}"
+GRID = {"dimensions": {"width": 3, "height": 2}, "crsCode": "EPSG:4326"}
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    """Stand-in Earth Engine backend, initialized without credentials; returns its call counts."""
+    calls = Counter()
+
+    def compute_value(obj):
+        calls["computeValue"] += 1
+        return 7
+
+    def get_map_id(params):
+        calls["getMapId"] += 1
+        return {"mapid": MAP_ID, "token": "", "tile_fetcher": ee.data.TileFetcher(TILE_URL, map_name=MAP_ID)}
+
+    def compute_pixels(params):
+        calls["computePixels"] += 1
+        return np.arange(6, dtype=np.uint16).reshape(2, 3)
+
+    monkeypatch.setattr(ee.data, "computeValue", compute_value)
+    monkeypatch.setattr(ee.data, "getMapId", get_map_id)
+    monkeypatch.setattr(ee.data, "computePixels", compute_pixels)
+    monkeypatch.setattr(ee.data, "getAlgorithms", apitestcase.GetAlgorithms)
+    monkeypatch.setattr(ee.data, "_install_cloud_api_resource", lambda: None)
+    monkeypatch.setattr(ee.deprecation, "_FetchDataCatalogStac", lambda: {})
+    ee.Initialize(None, project="test")
+    yield calls
+    ee.Reset()
+
+
+def requests():
+    image = ee.Image(1).add(2)
+    value = ee.Number(3).add(4).getInfo()
+    map_id = image.getMapId({"min": 0, "max": 3})
+    pixels = ee.data.computePixels({"expression": image, "fileFormat": "NUMPY_NDARRAY", "grid": GRID})
+    return value, map_id, pixels
+
+
+def test_record_then_replay(backend, tmp_path):
+    path = str(tmp_path / "cassette.json.gz")
+    with Cassette(path, mode="record"):
+        recorded = requests()
+    assert backend == {"computeValue": 1, "getMapId": 1, "computePixels": 1}
+
+    with Cassette(path, mode="replay") as cassette:
+        value, map_id, pixels = requests()
+        with pytest.raises(CassetteMiss):
+            ee.Number(5).getInfo()
+
+    # Answered from the file alone
+    assert backend == {"computeValue": 1, "getMapId": 1, "computePixels": 1}
+    assert cassette.counts["getMapId"] == 1 and cassette.counts["computeValue"] == 2
+    assert value == recorded[0]
+    assert map_id["mapid"] == MAP_ID
+    assert map_id["tile_fetcher"].url_format == recorded[1]["tile_fetcher"].url_format
+    np.testing.assert_array_equal(pixels, recorded[2])
+    assert pixels.dtype == np.uint16
+
+
+def test_offline_cassette_builds_graphs_without_requests():
+    with Cassette() as cassette:
+        graph = ee.Image(1).add(2).reduceNeighborhood(ee.Reducer.mean(), ee.Kernel.square(1))
+        assert "Image.reduceNeighborhood" in graph.serialize()
+        with pytest.raises(CassetteMiss):
+            graph.getInfo()
+    assert cassette.counts == {"getAlgorithms": 1, "computeValue": 1}
+    assert "getAlgorithms" in {e["call"] for e in ee_cassette.offline_entries().values()}
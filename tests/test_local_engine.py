@@ -0,0 +1,131 @@
+from datetime import date
+import numpy as np
+import pandas as pd
+from utils import local_engine
+from utils.dekad_pipeline import dekad_dates
+
+RNG = np.random.default_rng(0)
+
+
+def stack_with_gaps(shape=(2, 7, 9)):
+    stack = RNG.uniform(0.01, 0.5, shape)
+    stack[0, 0, 0] = np.nan
+    stack[1, 3, 4] = np.nan
+    return stack
+
+
+def brute_mean_var(image, n):
+    H, W = image.shape
+    mean, var = np.full((H, W), np.nan), np.full((H, W), np.nan)
+    for y in range(H):
+        for x in range(W):
+            window = image[max(y - n, 0):y + n + 1, max(x - n, 0):x + n + 1]
+            window = window[np.isfinite(window)]
+            if window.size:
+                mean[y, x], var[y, x] = window.mean(), window.var()
+    return mean, var
+
+
+def test_local_mean_var_matches_window_loop():
+    stack = stack_with_gaps()
+    mean, var = local_engine.local_mean_var(stack, n=2)
+    for band in range(stack.shape[0]):
+        expected_mean, expected_var = brute_mean_var(stack[band], 2)
+        np.testing.assert_allclose(mean[band], expected_mean)
+        np.testing.assert_allclose(var[band], expected_var, atol=1e-12)
+
+
+def test_lee_filter_matches_formula():
+    stack, enl = stack_with_gaps(), 4.0
+    out = local_engine.lee_filter(stack, n=1, enl=enl)
+    for band in range(stack.shape[0]):
+        mean, var = brute_mean_var(stack[band], 1)
+        sigma_v2 = 1.0 / enl
+        var_x = (var - mean ** 2 * sigma_v2) / (1.0 + sigma_v2)
+        k = np.clip(np.divide(var_x, var, out=np.zeros_like(var), where=var > 0), 0, None)
+        expected = mean + k * (stack[band] - mean)
+        expected[~np.isfinite(stack[band])] = np.nan
+        np.testing.assert_allclose(out[band], expected)
+
+
+def test_mrvi_and_uint16_scaling():
+    vv, vh = np.array([0.2, 0.05, 0.0]), np.array([0.05, 0.2, 0.0])
+    values = local_engine.mrvi(vv, vh)
+    for i in range(2):
+        total = vv[i] + vh[i]
+        assert values[i] == np.sqrt(vv[i] / total) * (vh[i] * 4 / total)
+    assert np.isnan(values[2])
+
+    scaled = local_engine.to_uint16(np.array([0.12345, -0.5, 7.0, np.nan]))
+    assert scaled.dtype == np.uint16
+    # x10000, truncated, clamped to the uint16 range, NaN masked
+    assert scaled[:3].tolist() == [1234, 0, 65535]
+    assert scaled.mask.tolist() == [False, False, False, True]
+
+
+def test_dekad_median_matches_per_dekad_selection():
+    start, end = "2024-01-01", "2024-02-20"
+    times = pd.to_datetime([
+        "2023-12-30", "2024-01-02", "2024-01-05", "2024-01-09", "2024-01-14",
+        "2024-02-02", "2024-02-19", "2024-02-21",
+    ])
+    stack = RNG.uniform(0, 1, (len(times), 3, 4))
+    stack[1, 0, 0] = np.nan
+
+    medians, dekads = local_engine.dekad_median(stack, times, start, end)
+
+    windows = dekad_dates(start, end) + [date(2024, 2, 20)]
+    expected, expected_dekads = [], []
+    for lo, hi in zip(windows[:-1], windows[1:]):
+        inside = (times >= pd.Timestamp(lo)) & (times < pd.Timestamp(hi)) & (times >= pd.Timestamp(start))
+        if inside.any():
+            expected.append(np.nanmedian(stack[inside], axis=0))
+            expected_dekads.append(lo)
+
+    assert dekads == expected_dekads
+    np.testing.assert_allclose(medians, np.stack(expected))
+
+
+def brute_streak(growth):
+    length, start = np.zeros(growth.shape[1:], int), np.zeros(growth.shape[1:], int)
+    for y in range(growth.shape[1]):
+        for x in range(growth.shape[2]):
+            run = 0
+            for t in range(growth.shape[0]):
+                run = run + 1 if growth[t, y, x] else 0
+                if run > length[y, x]:  # strict: ties keep the earliest run
+                    length[y, x], start[y, x] = run, t - run + 1
+    return length, start
+
+
+def test_longest_growth_streak_matches_pixel_loop():
+    growth = RNG.uniform(size=(12, 13, 11)) < 0.6
+    growth[:, 0, 0] = False
+    # Two runs of 3 on one pixel: the earlier one wins
+    growth[:, 1, 1] = [1, 1, 1, 0, 0, 1, 1, 1, 0, 0, 0, 0]
+    starts = list(pd.date_range("2024-01-01", periods=12, freq="12D"))
+
+    out = local_engine.longest_growth_streak(growth, starts, tile_size=5)
+    length, start = brute_streak(growth)
+
+    np.testing.assert_array_equal(out["length"], length)
+    has_streak = length > 0
+    for y, x in np.ndindex(length.shape):
+        stamp = starts[start[y, x]]
+        expected = (stamp.value // 10**6, stamp.month, stamp.month * 100 + stamp.day) if has_streak[y, x] else (0, 0, 0)
+        assert (out["start_millis"][y, x], out["start_month"][y, x], out["start_mmdd"][y, x]) == expected
+
+    assert out["length"][1, 1] == 3 and out["start_mmdd"][1, 1] == 101
+    assert out["length"][0, 0] == 0 and out["start_millis"][0, 0] == 0
+
+
+def test_all_nan_pixels_have_no_streak():
+    values = np.tile(np.arange(1, 7, dtype=float)[:, None, None] / 10, (1, 3, 3))
+    values[:, 2, 1] = np.nan
+    dekads = dekad_dates("2024-01-01", "2024-03-01")[:6]
+
+    growth, starts = local_engine.sequential_growth_stack(local_engine.to_uint16(values), dekads)
+    out = local_engine.longest_growth_streak(growth, starts, tile_size=2)
+
+    assert out["length"][2, 1] == 0 and out["start_month"][2, 1] == 0
+    assert out["length"][0, 0] == 4 and out["start_mmdd"][0, 0] == 101
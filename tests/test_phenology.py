@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+from utils import phenology
+from utils.dekad_pipeline import dekad_dates
+
+TIMES = pd.to_datetime(dekad_dates("2024-01-01", "2024-07-01"))
+T = np.arange(len(TIMES))
+
+
+def bell(peak, sos, height=0.6):
+    """Bell-shaped season peaking at dekad peak, with the pre-season low at dekad sos."""
+    return 0.2 + height * np.exp(-((T - peak) / 3.0) ** 2) - 0.1 * np.exp(-((T - sos) / 1.5) ** 2)
+
+
+def points_frame(series):
+    return pd.DataFrame({
+        "time": np.tile(TIMES, len(series)),
+        "point_id": np.repeat([f"p{i}" for i in range(len(series))], len(TIMES)),
+        "mRVI_median": np.concatenate(series),
+    })
+
+
+def naive_stages(values):
+    """SOS, peak and harvest indices of one unsmoothed series, one dekad at a time."""
+    peak = max(range(len(values)), key=lambda i: (values[i], -i))
+    sos = min(range(peak + 1), key=lambda i: (values[i], i))
+    threshold = values[peak] - phenology.HARVEST_DROP * (values[peak] - values[sos])
+    after = range(peak + 1, len(values))
+    if not after:
+        return sos, peak, peak
+    harvest = next((i for i in after if values[i] <= threshold), min(after, key=lambda i: (values[i], i)))
+    return sos, peak, harvest
+
+
+def detect_unsmoothed(series):
+    # A one-dekad median window leaves the series unchanged, so stages can be checked exactly
+    return phenology.detect(points_frame(series), method="median", window=1)
+
+
+def test_consensus_dates_of_bell_shaped_points():
+    series = [bell(peak, peak - 5) for peak in (7, 8, 8, 9, 10)]
+    points, consensus = detect_unsmoothed(series)
+
+    stages = np.array([naive_stages(s) for s in series])
+    days = np.asarray((TIMES - TIMES[0]).days, dtype=float)
+    for k, stage in enumerate(phenology.STAGES):
+        idx = stages[:, k]
+        assert list(points[stage]) == list(TIMES[idx])
+        q1, q3 = np.percentile(days[idx], [25, 75])
+        assert consensus[stage] == {"date": TIMES[int(np.median(idx))], "iqr_days": q3 - q1, "points": 5}
+
+    assert consensus["peak"]["date"] == TIMES[8]
+    assert consensus["start"]["date"] == TIMES[3]
+    assert consensus["peak"]["iqr_days"] == (TIMES[9] - TIMES[8]).days
+
+
+def test_smoothed_peak_stays_on_the_bell():
+    _, consensus = phenology.detect(points_frame([bell(8, 3)] * 3))
+    assert abs((consensus["peak"]["date"] - TIMES[8]).days) <= 12
+
+
+def test_low_amplitude_points_do_not_vote():
+    points, consensus = detect_unsmoothed([bell(8, 3), bell(8, 3), bell(12, 7, height=0.05)])
+    assert list(points["votes"]) == [True, True, False]
+    assert consensus["peak"] == {"date": TIMES[8], "iqr_days": 0.0, "points": 2}
+
+
+def test_peak_on_last_dekad_keeps_the_peak_as_harvest():
+    rising = np.linspace(0.1, 0.8, len(TIMES))
+    points, consensus = detect_unsmoothed([rising])
+    assert points["peak"].iloc[0] == points["harvest"].iloc[0] == TIMES[-1]
+    assert consensus["harvest"]["date"] == TIMES[-1]
+
+
+def test_no_drop_below_threshold_takes_lowest_value_after_peak():
+    values = bell(8, 3)
+    # Only a shallow decline after the peak, lowest on dekad 14, never down to HARVEST_DROP
+    values[9:] = values[8] - np.array([0.05, 0.08, 0.1, 0.11, 0.12, 0.13, 0.12, 0.12, 0.125, 0.11])
+    points, _ = detect_unsmoothed([values])
+    assert naive_stages(values)[2] == 14
+    assert points["harvest"].iloc[0] == TIMES[14]
+
+
+def test_zero_amplitude_points_all_vote():
+    flat = [np.full(len(TIMES), 0.3)] * 3
+    points, consensus = detect_unsmoothed(flat)
+    assert (points["amplitude"] == 0).all() and points["votes"].all()
+    assert consensus["peak"] == {"date": TIMES[0], "iqr_days": 0.0, "points": 3}
@@ -0,0 +1,86 @@
+from datetime import date, timedelta
+import pytest
+from utils import rain_aggregates
+from utils.rain_aggregates import MemoryStore, aggregate, error_bound, materialize, plan_blocks
+
+
+def daily_rain(d):
+    """Synthetic daily rainfall total for day d."""
+    return d.toordinal() % 7
+
+
+class Bands(dict):
+    """Stand-in for an ee.Image: band name -> value."""
+
+    def select(self, bands):
+        return Bands({band: self[band] for band in bands})
+
+
+class Collection:
+    def __init__(self, images):
+        self.images = images
+
+    def sum(self):
+        return Bands({band: sum(image[band] for image in self.images) for band in self.images[0]})
+
+
+@pytest.fixture
+def raw_blocks(monkeypatch):
+    """Replace the raw GPM collection with daily_rain; returns the blocks built from it."""
+    built = []
+
+    def block_image(level, start, histogram=True):
+        built.append((level, start))
+        days = (rain_aggregates.block_end(level, start) - start).days
+        rain = sum(daily_rain(start + timedelta(days=i)) for i in range(days))
+        bands = {"sum": rain, "count": 48 * days}
+        if histogram:
+            bands.update({band: 0 for band in rain_aggregates.HIST_BANDS})
+        return Bands(bands)
+
+    monkeypatch.setattr(rain_aggregates, "block_image", block_image)
+    monkeypatch.setattr(rain_aggregates.ee, "ImageCollection", Collection)
+    return built
+
+
+def test_plan_blocks_uses_largest_whole_blocks():
+    assert plan_blocks("2024-01-30", "2024-03-15") == [
+        ("day", date(2024, 1, 30)),
+        ("day", date(2024, 1, 31)),
+        ("month", date(2024, 2, 1)),
+        ("dekad", date(2024, 3, 1)),
+        ("day", date(2024, 3, 13)),
+        ("day", date(2024, 3, 14)),
+    ]
+    assert plan_blocks("2024-01-05", "2024-01-05") == []
+
+
+def test_aggregate_combines_stored_and_raw_blocks(raw_blocks):
+    store = MemoryStore()
+    assert materialize(store, "2024-01-01", "2024-02-10", levels=("month",)) == [("month", date(2024, 1, 1))]
+    raw_blocks.clear()
+
+    total = aggregate("2023-12-30", "2024-02-14", store)
+
+    days = [date(2023, 12, 30) + timedelta(days=i) for i in range(46)]
+    assert total["sum"] == sum(daily_rain(d) for d in days)
+    assert total["count"] == 48 * len(days)
+    # January came from the store; everything else from the raw collection
+    assert raw_blocks == [("day", date(2023, 12, 30)), ("day", date(2023, 12, 31)),
+                          ("dekad", date(2024, 2, 1)), ("day", date(2024, 2, 13))]
+
+
+def test_materialize_skips_stored_blocks(raw_blocks):
+    store = MemoryStore()
+    materialize(store, "2024-01-01", "2024-01-13", levels=("dekad",))
+    assert materialize(store, "2024-01-01", "2024-02-01", levels=("dekad",)) == [
+        ("dekad", date(2024, 1, 13)), ("dekad", date(2024, 1, 25)),
+    ]
+    # Stored blocks carry the histogram bands for medians
+    assert set(rain_aggregates.HIST_BANDS) <= set(store.get("dekad", date(2024, 1, 1)))
+
+
+def test_error_bound():
+    assert error_bound("Median") == rain_aggregates.HIST_WIDTH / 2
+    assert error_bound("Mean") == 0.0
+    assert error_bound("Sum") == 0.0
@@ -0,0 +1,58 @@
+import os
+import numpy as np
+import pytest
+from utils import raster_cache
+
+SCALE = raster_cache.SCALE
+# 700 x 600 pixels: four tiles, two of them partial
+BOUNDS = (400000, 700000, 400000 + 700 * SCALE, 700000 + 600 * SCALE)
+
+
+class FakeImage:
+    def serialize(self):
+        return "synthetic-paddy"
+
+
+def fetch_tile(image, grid):
+    """Paddy in the 100 westernmost columns; March starts (day 5) in the northern 300 rows."""
+    transform, dims = grid["affineTransform"], grid["dimensions"]
+    col0 = round((transform["translateX"] - BOUNDS[0]) / SCALE)
+    row0 = round((BOUNDS[3] - transform["translateY"]) / SCALE)
+    cols = col0 + np.arange(dims["width"])[None, :]
+    rows = row0 + np.arange(dims["height"])[:, None]
+
+    paddy = np.broadcast_to(cols < 100, (dims["height"], dims["width"]))
+    month = np.where(paddy & (rows < 300), 3, 0)
+    return np.stack([paddy, month, np.where(month > 0, month * 100 + 5, 0)])
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(raster_cache, "RASTER_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(raster_cache, "paddy_image", lambda *images: FakeImage())
+    monkeypatch.setattr(raster_cache, "MAX_TILES_IN_FLIGHT", 2)
+    return tmp_path
+
+
+def test_exported_raster_gives_known_areas(cache_dir):
+    path = raster_cache.export_paddy_rasters(None, None, None, None, end_date="2024-01-01",
+                                             fetch_tile=fetch_tile, bounds=BOUNDS)
+    assert os.listdir(cache_dir) == [os.path.basename(path)]
+
+    total_ha, month_stats, mmdd_stats = raster_cache.local_statistics(path)
+    pixel_ha = SCALE * SCALE / 10000
+    assert total_ha == pytest.approx(100 * 600 * pixel_ha)
+    assert month_stats == pytest.approx({3: 100 * 300 * pixel_ha})
+    assert mmdd_stats == pytest.approx({305: 100 * 300 * pixel_ha})
+
+
+def test_failed_export_leaves_no_files(cache_dir):
+    def failing_fetch(image, grid):
+        if grid["affineTransform"]["translateX"] > BOUNDS[0]:
+            raise RuntimeError("tile failed")
+        return fetch_tile(image, grid)
+
+    with pytest.raises(RuntimeError):
+        raster_cache.export_paddy_rasters(None, None, None, None, end_date="2024-01-01",
+                                          fetch_tile=failing_fetch, bounds=BOUNDS)
+    assert os.listdir(cache_dir) == []
@@ -0,0 +1,21 @@
+import ee
+from googleapiclient import model
+from utils import tracing
+
+
+def test_ee_hooks_count_requests_only_during_traces(monkeypatch, tmp_path):
+    monkeypatch.setattr(ee.data, "getMapId", lambda params: {"mapid": "m1"})
+    get_map_id, deserialize = ee.data.getMapId, model.JsonModel.deserialize
+    log_path = str(tmp_path / "traces.jsonl")
+
+    with tracing.trace("outer", log_path) as outer:
+        with tracing.trace("inner", log_path) as inner:
+            ee.data.getMapId({})
+        # The inner trace ending must not remove the hooks the outer one still uses
+        ee.data.getMapId({})
+        assert ee.data.getMapId is not get_map_id
+
+    assert ee.data.getMapId is get_map_id
+    assert model.JsonModel.deserialize is deserialize
+    assert inner.spans[0].requests == 1
+    assert outer.spans[0].requests == 1
@@ -0,0 +1,74 @@
+from functools import lru_cache
+import ee
+from shapely.geometry import Polygon, MultiPolygon, mapping
+from utils import vector_store
+from utils.config import DATA_DIR, COUNTRY_MASK_ASSET
+
+
+# Simplification of the dissolved national outline (degrees, ~200 m)
+BOUNDARY_TOLERANCE = 0.002
+# Pixel size (m) of the exported country mask
+MASK_SCALE = 100
+
+
+@lru_cache(maxsize=1)
+def country_shape(data_dir=DATA_DIR):
+    """Sri Lanka outline as a shapely geometry: lka_dis districts dissolved, holes dropped, simplified."""
+    districts = vector_store.get_layer(data_dir, "lka_dis", BOUNDARY_TOLERANCE)
+    if districts is None:
+        return None
+
+    # Close the slivers left between simplified district edges while dissolving
+    closing = BOUNDARY_TOLERANCE / 2
+    dissolved = districts.geometry.union_all().buffer(closing).buffer(-closing)
+    parts = dissolved.geoms if isinstance(dissolved, MultiPolygon) else [dissolved]
+    outline = MultiPolygon([Polygon(p.exterior) for p in parts])
+    return outline.simplify(BOUNDARY_TOLERANCE, preserve_topology=True)
+
+
+@lru_cache(maxsize=1)
+def get_sri_lanka_geometry():
+    """National boundary as ee.Geometry, built once per process from the local district layer."""
+    shape = country_shape()
+    if shape is None:
+        # No local districts: fall back to the GAUL boundary on the server
+        return ee.FeatureCollection("FAO/GAUL_SIMPLIFIED_500m/2015") \
+            .filter(ee.Filter.eq("ADM0_NAME", "Sri Lanka")) \
+            .geometry()
+    return ee.Geometry(mapping(shape), proj="EPSG:4326", geodesic=False)
+
+
+@lru_cache(maxsize=1)
+def get_country_mask():
+    """
+    Single-band mask, 1 inside Sri Lanka and masked outside.
+    Uses COUNTRY_MASK_ASSET when configured, otherwise paints the boundary on the fly (for every
+    tile); production deployments should set it (`batch_runner.py --export-country-mask`).
+    """
+    if COUNTRY_MASK_ASSET:
+        return ee.Image(COUNTRY_MASK_ASSET)
+    return ee.Image().byte().paint(ee.FeatureCollection([ee.Feature(get_sri_lanka_geometry())]), 1)
+
+
+def mask_to_country(image):
+    """Restrict an image to Sri Lanka with updateMask (cheaper per tile than clip to a polygon)."""
+    return image.updateMask(get_country_mask())
+
+
+def export_country_mask(asset_id, scale=MASK_SCALE):
+    """
+    Start an export of the painted mask to asset_id (run through `batch_runner.py --export-country-mask`);
+    point RICEWATER_COUNTRY_MASK_ASSET at it when done.
+    """
+    geometry = get_sri_lanka_geometry()
+    mask = ee.Image().byte().paint(ee.FeatureCollection([ee.Feature(geometry)]), 1).rename("mask")
+    task = ee.batch.Export.image.toAsset(
+        image=mask,
+        description="sri_lanka_mask",
+        assetId=asset_id,
+        region=geometry.bounds(),
+        scale=scale,
+        maxPixels=1e10,
+    )
+    task.start()
+    return task
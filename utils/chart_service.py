@@ -0,0 +1,114 @@
+# Off-thread matplotlib rendering to PNG / SVG bytes, with a shared size-bounded cache
+import io
+import hashlib
+import threading
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import pandas as pd
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import streamlit as st
+from utils import tracing
+
+
+# Rendering is CPU bound; a couple of workers keep the request thread free without starving it
+MAX_RENDER_WORKERS = 2
+# Rendered bytes kept across all sessions
+CACHE_MAX_BYTES = 64 * 2 ** 20
+DPI = 100
+
+_cache = OrderedDict()
+_cache_bytes = 0
+_lock = threading.Lock()
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_RENDER_WORKERS, thread_name_prefix="chart-render")
+        return _executor
+
+
+def _hash_arg(h, arg):
+    if isinstance(arg, (pd.DataFrame, pd.Series)):
+        h.update(pd.util.hash_pandas_object(arg, index=True).values.tobytes())
+        h.update(repr(list(arg.columns) if isinstance(arg, pd.DataFrame) else arg.name).encode())
+    else:
+        h.update(repr(arg).encode())
+
+
+def chart_key(draw, args, kwargs, figsize, fmt):
+    """Cache key: the draw function, its DataFrame inputs (by content) and the output settings."""
+    h = hashlib.sha1(f"{draw.__module__}.{draw.__qualname__}|{figsize}|{fmt}|{DPI}".encode())
+    for arg in args:
+        _hash_arg(h, arg)
+    for name in sorted(kwargs):
+        h.update(name.encode())
+        _hash_arg(h, kwargs[name])
+    return h.hexdigest()
+
+
+def _cache_get(key):
+    with _lock:
+        data = _cache.get(key)
+        if data is not None:
+            _cache.move_to_end(key)
+        return data
+
+
+def _cache_put(key, data):
+    global _cache_bytes
+    with _lock:
+        if key in _cache:
+            return
+        _cache[key] = data
+        _cache_bytes += len(data)
+        while _cache_bytes > CACHE_MAX_BYTES and len(_cache) > 1:
+            _, evicted = _cache.popitem(last=False)
+            _cache_bytes -= len(evicted)
+
+
+def _render(key, draw, args, kwargs, figsize, fmt):
+    with tracing.span(f"chart.{draw.__name__}"):
+        # A bare Figure on the Agg canvas: no pyplot state, so renders can run side by side
+        fig = Figure(figsize=figsize, dpi=DPI)
+        FigureCanvasAgg(fig)
+        try:
+            draw(fig, *args, **kwargs)
+            buf = io.BytesIO()
+            fig.savefig(buf, format=fmt, bbox_inches="tight")
+        finally:
+            fig.clear()
+        data = buf.getvalue()
+        _cache_put(key, data)
+        return data
+
+
+def submit(draw, *args, figsize=(12, 6), fmt="png", **kwargs):
+    """
+    Render draw(fig, *args, **kwargs) to fmt bytes on the chart pool; returns a Future.
+    Charts already drawn for the same inputs (by any session) come from the cache.
+    """
+    key = chart_key(draw, args, kwargs, figsize, fmt)
+    data = _cache_get(key)
+    if data is not None:
+        done = Future()
+        done.set_result(data)
+        return done
+    # The worker runs in a copy of the caller's context so its span lands in the caller's trace
+    return _get_executor().submit(contextvars.copy_context().run, _render, key, draw, args, kwargs, figsize, fmt)
+
+
+def render(draw, *args, figsize=(12, 6), fmt="png", **kwargs):
+    """Blocking submit(): the rendered bytes."""
+    return submit(draw, *args, figsize=figsize, fmt=fmt, **kwargs).result()
+
+
+def show(data, fmt="png"):
+    """Display rendered chart bytes (or a Future of them) at container width."""
+    if isinstance(data, Future):
+        data = data.result()
+    st.image(data.decode() if fmt == "svg" else data, width="stretch")
@@ -1,24 +1,62 @@
+import os
 import ee
 
 
-AOI_OPTIONS = {
-    "Walawa Irrigation Scheme": "projects/ricemapping-475407/assets/UWIS_aoi",
+# Irrigation schemes: boundary plus the sample points and road / water masks used inside it
+AOI_REGISTRY = {
+    "Walawa Irrigation Scheme": {
+        "aoi": "projects/ricemapping-475407/assets/UWIS_aoi",
+        "points": "projects/ricemapping-475407/assets/UWIS_pts",
+        "roads": "projects/ricemapping-475407/assets/UWIS_roads",
+        "water": "projects/ricemapping-475407/assets/UWIS_water",
+    },
+    # "MahaKanadarawa Irrigable Area": {...},
 }
 
-ASSETS = {
-    "points": "projects/ricemapping-475407/assets/UWIS_pts",
-    "roads": "projects/ricemapping-475407/assets/UWIS_roads",
-    "water": "projects/ricemapping-475407/assets/UWIS_water",
-}
+DEFAULT_SCHEME = "Walawa Irrigation Scheme"
+
+AOI_OPTIONS = {name: scheme["aoi"] for name, scheme in AOI_REGISTRY.items()}
+
+# Local on-disk caches (point series, rasters, vector layers)
+CACHE_DIR = os.environ.get(
+    "RICEWATER_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache")
+)
+
+# Bundled shapefiles (districts, basins, roads, rivers)
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+# Rasterized Sri Lanka mask asset; without it the boundary polygon is painted per tile.
+# Create it once with `python batch_runner.py --export-country-mask <asset id>`.
+COUNTRY_MASK_ASSET = os.environ.get("RICEWATER_COUNTRY_MASK_ASSET")
+
+def scheme_for_aoi(aoi_path):
+    """Registry name of the scheme whose boundary asset is aoi_path."""
+    for name, scheme in AOI_REGISTRY.items():
+        if scheme["aoi"] == aoi_path:
+            return name
+    raise KeyError(f"No scheme registered for AOI {aoi_path}")
+
+
+def pipeline_aoi(schemes):
+    """
+    AOI key for get_dekad_pipeline: one scheme -> its boundary asset,
+    several -> sorted tuple of boundary assets (one pipeline over their union bounds).
+    """
+    if isinstance(schemes, str):
+        schemes = [schemes]
+    paths = sorted({AOI_REGISTRY[name]["aoi"] for name in schemes})
+    return paths[0] if len(paths) == 1 else tuple(paths)
+
 
-def load_assets():
-    return {
-        # AOIs
-        "WIS": ee.FeatureCollection(AOI_OPTIONS["Walawa Irrigation Scheme"]),
-        # "IA": ee.FeatureCollection(AOI_OPTIONS["MahaKanadarawa Irrigable Area"]),
-
-        # Supporting layers
-        "points": ee.FeatureCollection(ASSETS["points"]),
-        "roads": ee.FeatureCollection(ASSETS["roads"]),
-        "water": ee.FeatureCollection(ASSETS["water"])
-    }
+def load_assets(scheme=DEFAULT_SCHEME):
+    """
+    Boundary, points, roads and water FeatureCollections of a scheme.
+    A list of schemes returns each layer merged across them.
+    """
+    names = [scheme] if isinstance(scheme, str) else list(scheme)
+    assets = {}
+    for layer in ("aoi", "points", "roads", "water"):
+        collections = [ee.FeatureCollection(AOI_REGISTRY[name][layer]) for name in names]
+        assets[layer] = collections[0] if len(collections) == 1 else ee.FeatureCollection(collections).flatten()
+    return assets
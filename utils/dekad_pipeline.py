@@ -0,0 +1,170 @@
+import ee
+import pandas as pd
+from datetime import date
+from functools import lru_cache
+
+
+# Number of distinct (AOI, dates, filter settings) pipelines kept in memory
+PIPELINE_CACHE_SIZE = 16
+
+
+# Define the Lee filter function for GEE
+def lee_filter_gee(img, n=2, ENL=5.0):
+    """
+    Lee Filter for speckle reduction in GEE.
+    """
+    img = ee.Image(img)
+    kernel = ee.Kernel.square(radius=n, units='pixels', normalize=True)
+
+    # Local mean and variance
+    mean_img = img.reduceNeighborhood(reducer=ee.Reducer.mean(), kernel=kernel)
+    var_img = img.reduceNeighborhood(reducer=ee.Reducer.variance(), kernel=kernel)
+
+    sigma_v = ee.Number(1.0).divide(ENL).sqrt()  # (1/ENL)^0.5
+    sigma_v2 = sigma_v.pow(2)
+
+    var_x = var_img.subtract(mean_img.pow(2).multiply(sigma_v2)) \
+                .divide(ee.Number(1).add(sigma_v2))
+    k = var_x.divide(var_img)
+    k = k.where(k.lt(0), 0)
+
+    lee_img = mean_img.add(k.multiply(img.subtract(mean_img)))
+
+    # Explicitly ensure output is an ee.Image
+    return ee.Image(lee_img).copyProperties(img, img.propertyNames())
+
+
+# Calculate mRVI from filtered bands
+def add_mrvi(img):
+    vv = img.select('VV_filtered')
+    vh = img.select('VH_filtered')
+    mRVI = vv.divide(vv.add(vh)).pow(0.5).multiply(vh.multiply(4).divide(vv.add(vh))).rename('mRVI')
+    return img.addBands(mRVI)
+
+
+def dekad_dates(start_date, end_date):
+    """
+    Client-side list of dekad start dates (1st, 13th, 25th of each month).
+    Covers every month from start_date's month to end_date's month, keeping dates <= end_date.
+    """
+    start = pd.to_datetime(str(start_date)).date()
+    end = pd.to_datetime(str(end_date)).date()
+
+    dekads = []
+    y, m = start.year, start.month
+    while (y, m) <= (end.year, end.month):
+        for day in (1, 13, 25):
+            d = date(y, m, day)
+            if d <= end:
+                dekads.append(d)
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return dekads
+
+
+def build_dekad_list(start_date, end_date):
+    """Server-side ee.List of the dekad dates, identical to dekad_dates() on the client."""
+    return ee.List([ee.Date(d.isoformat()) for d in dekad_dates(start_date, end_date)])
+
+
+def aoi_geometry(aoi_path):
+    """
+    Geometry for a pipeline AOI key: one asset path -> its geometry;
+    a tuple of paths (several schemes) -> bounds of their union.
+    """
+    if isinstance(aoi_path, tuple):
+        return ee.FeatureCollection([ee.FeatureCollection(p) for p in aoi_path]).flatten().geometry().bounds()
+    return ee.FeatureCollection(aoi_path).geometry()
+
+
+class DekadMosaicPipeline:
+    """
+    Dekad list -> Lee filter -> mRVI -> dekad median mosaics for one AOI and date range.
+    Built once per key and shared by time series, rice mapping and monitoring.
+    With a tuple of AOI paths the collection is filtered to their union bounds, so several
+    schemes are served by one set of mosaics.
+    """
+
+    def __init__(self, aoi_path, start_date, end_date, polarization='VH', lee_radius=2, enl=4.0):
+        self.key = (aoi_path, str(start_date), str(end_date), polarization, lee_radius, enl)
+        self.aoi = aoi_geometry(aoi_path)
+
+        startDate = ee.Date(str(start_date))
+        endDate = ee.Date(str(end_date))
+
+        # Creates a list of dekads (12-day periods per month) from the given date range
+        self.filteredDekadList = build_dekad_list(start_date, end_date)
+        filteredDekadList = self.filteredDekadList
+
+        # Load the Sentinel-1 GRD ImageCollection with raw SAR images (VV, VH)
+        s1 = ee.ImageCollection('COPERNICUS/S1_GRD_FLOAT') \
+            .filterBounds(self.aoi) \
+            .filterDate(startDate, endDate) \
+            .filter(ee.Filter.eq('instrumentMode','IW')) \
+            .filter(ee.Filter.listContains('transmitterReceiverPolarisation', polarization)) \
+            .filter(ee.Filter.eq('resolution_meters', 10))
+
+        # Apply Lee filter to raw bands
+        def filter_raw(img):
+            img = ee.Image(img)
+            vv_f = ee.Image(lee_filter_gee(img.select('VV'), n=lee_radius, ENL=enl)).rename('VV_filtered')
+            vh_f = ee.Image(lee_filter_gee(img.select('VH'), n=lee_radius, ENL=enl)).rename('VH_filtered')
+            return img.addBands([vv_f, vh_f])
+
+        s1_filtered = s1.map(filter_raw)
+
+        rvi_filtered = s1_filtered.map(add_mrvi).select('mRVI')
+        rvi_sorted = rvi_filtered.sort("system:time_start")
+
+        def func_wxd(dekad):
+            start_date = ee.Date(dekad)
+            currentIndex = ee.Number(filteredDekadList.indexOf(dekad))
+            nextIndex = currentIndex.add(1)
+            nextDate = ee.Algorithms.If(
+                nextIndex.lt(filteredDekadList.size()),
+                ee.Date(filteredDekadList.get(nextIndex)),
+                endDate
+            )
+
+            dekadImages = rvi_sorted.filterDate(start_date, nextDate)
+            mRVIImages = dekadImages.select('mRVI')
+
+            def make_image():
+                img = mRVIImages.reduce(ee.Reducer.median())
+                # Set dekad and system:time_start correctly
+                return img.set({
+                    'dekad': dekad,
+                    'system:time_start': start_date.millis()
+                })
+
+            return ee.Algorithms.If(
+                mRVIImages.size().gt(0),
+                make_image(),
+                None
+            )
+
+        # Convert List to ImageCollection & Remove Nulls
+        mosaicImages = ee.List(filteredDekadList.map(func_wxd)).removeAll([None])
+        mosaicCollection = ee.ImageCollection.fromImages(mosaicImages)
+
+        def func_zty(img):
+            # preserve properties
+            img2 = img.multiply(10000).toUint16()
+            return img2.copyProperties(img, ['dekad', 'system:time_start'])
+
+        self.mosaicCollectionUInt16 = mosaicCollection.map(func_zty)
+
+
+@lru_cache(maxsize=PIPELINE_CACHE_SIZE)
+def _cached_pipeline(key):
+    return DekadMosaicPipeline(*key)
+
+
+def get_dekad_pipeline(aoi_path, start_date, end_date, polarization='VH', lee_radius=2, enl=4.0):
+    """
+    Return the shared DekadMosaicPipeline for this key, building it on first use.
+    aoi_path is one asset path or a list/tuple of them (see config.pipeline_aoi).
+    """
+    if isinstance(aoi_path, (list, tuple)):
+        aoi_path = tuple(sorted(set(aoi_path))) if len(set(aoi_path)) > 1 else aoi_path[0]
+    key = (aoi_path, str(start_date), str(end_date), polarization, int(lee_radius), float(enl))
+    return _cached_pipeline(key)
@@ -0,0 +1,81 @@
+# Per-dekad point statistics for season thresholds, computed once and looked up by date
+import numpy as np
+import pandas as pd
+
+
+STAT_COLUMNS = ("q1", "median", "q3", "mean", "count")
+
+
+class DekadStats:
+    """
+    Quartiles, mean and point count of the point values of every dekad (all seasons and years
+    in df_points), from one groupby. Lookups by date are O(1); dates without data give NaN,
+    like an empty selection did.
+    """
+
+    def __init__(self, df_points, value_col="mRVI_median"):
+        values = df_points[value_col].astype(float)
+        grouped = values.groupby(pd.to_datetime(df_points["time"]).values)
+
+        # reindex: an empty df_points (no points sampled) unstacks to no columns at all
+        table = grouped.quantile([0.25, 0.5, 0.75]).unstack().reindex(columns=[0.25, 0.5, 0.75])
+        table.columns = ["q1", "median", "q3"]
+        table["mean"] = grouped.mean()
+        table["count"] = grouped.count()
+        self.table = table.sort_index()
+        self.table.index.name = "time"
+
+        self._positions = {t: i for i, t in enumerate(self.table.index)}
+        # One extra all-NaN row: the position of every date without data
+        self._columns = {
+            c: np.append(self.table[c].to_numpy(dtype=float), np.nan) for c in STAT_COLUMNS
+        }
+        self._missing = len(self.table)
+
+    def position(self, date):
+        return self._positions.get(pd.Timestamp(date), self._missing)
+
+    def at(self, date):
+        """{q1, median, q3, mean, count} of one dekad."""
+        i = self.position(date)
+        return {c: self._columns[c][i] for c in STAT_COLUMNS}
+
+    def outlier_params(self, start, peak, harvest):
+        """Rice mapping thresholds for one season (the dict detect_outliers returns)."""
+        s, p, h = self.at(start), self.at(peak), self.at(harvest)
+        return {
+            "q3_start": s["q3"],
+            "q1_peak": p["q1"],
+            "mean_start": s["mean"],
+            "mean_peak": p["mean"],
+            "mean_harvest": h["mean"],
+            "diff_start_peak": p["mean"] - s["mean"],
+            "diff_peak_harvest": p["mean"] - h["mean"],
+        }
+
+    def sweep(self, starts, peaks, harvests):
+        """
+        outlier_params for every start < peak < harvest combination of the candidate dates,
+        as one row per combination. Vectorized: suited to calibrating over many seasons.
+        """
+        candidates = [pd.DatetimeIndex(pd.to_datetime(list(dates))) for dates in (starts, peaks, harvests)]
+        positions = [np.array([self.position(t) for t in c], dtype=int) for c in candidates]
+
+        grid = [g.ravel() for g in np.meshgrid(*[np.arange(len(c)) for c in candidates], indexing="ij")]
+        times = [c.values[g] for c, g in zip(candidates, grid)]
+        ordered = (times[0] < times[1]) & (times[1] < times[2])
+        ts, tp, th = (t[ordered] for t in times)
+        s, p, h = (pos[g[ordered]] for pos, g in zip(positions, grid))
+
+        col = self._columns
+        out = pd.DataFrame({
+            "start": ts, "peak": tp, "harvest": th,
+            "q3_start": col["q3"][s],
+            "q1_peak": col["q1"][p],
+            "mean_start": col["mean"][s],
+            "mean_peak": col["mean"][p],
+            "mean_harvest": col["mean"][h],
+        })
+        out["diff_start_peak"] = out["mean_peak"] - out["mean_start"]
+        out["diff_peak_harvest"] = out["mean_peak"] - out["mean_harvest"]
+        return out
@@ -0,0 +1,177 @@
+# Record / replay of Earth Engine requests, for offline benchmarks and regression runs
+import io
+import gzip
+import json
+import base64
+import hashlib
+import threading
+from collections import Counter
+import numpy as np
+import ee
+from ee import serializer
+
+
+# ee.data functions the project calls (getInfo goes through computeValue)
+RECORDED_CALLS = ("computeValue", "getMapId", "computePixels", "listAssets", "getAlgorithms")
+CASSETTE_VERSION = 1
+REPLAY_PROJECT = "cassette-replay"
+
+
+class CassetteMiss(ee.EEException):
+    """Raised in replay mode for a request that was never recorded."""
+
+
+# ---------------- Keys and payloads ----------------
+def _canonical(value):
+    """JSON-able form of request params; ee objects become their serialized graph."""
+    if isinstance(value, ee.ComputedObject):
+        return {"__ee__": serializer.encode(value, for_cloud_api=True)}
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def request_key(call, *args):
+    """Stable key of one request: the call name plus its canonical arguments."""
+    raw = json.dumps([call, _canonical(list(args))], sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _encode(call, response):
+    if call == "getMapId":
+        return {"mapid": response["mapid"], "token": response.get("token", ""),
+                "url_format": response["tile_fetcher"].url_format}
+    if isinstance(response, np.ndarray):
+        buf = io.BytesIO()
+        np.save(buf, response, allow_pickle=False)
+        return {"__ndarray__": base64.b64encode(buf.getvalue()).decode()}
+    if isinstance(response, bytes):
+        return {"__bytes__": base64.b64encode(response).decode()}
+    return response
+
+
+def _decode(call, payload):
+    if call == "getMapId":
+        return {"mapid": payload["mapid"], "token": payload["token"],
+                "tile_fetcher": ee.data.TileFetcher(payload["url_format"], map_name=payload["mapid"])}
+    if isinstance(payload, dict) and "__ndarray__" in payload:
+        return np.load(io.BytesIO(base64.b64decode(payload["__ndarray__"])), allow_pickle=False)
+    if isinstance(payload, dict) and "__bytes__" in payload:
+        return base64.b64decode(payload["__bytes__"])
+    return payload
+
+
+def offline_entries():
+    """
+    Cassette entries holding only the algorithm list bundled with the earthengine-api test
+    helpers: enough to initialize the client and build (but not evaluate) ee objects.
+    """
+    from ee import apitestcase
+
+    return {request_key("getAlgorithms"): {"call": "getAlgorithms", "responses": [apitestcase.GetAlgorithms()]}}
+
+
+# ---------------- Cassette ----------------
+class Cassette:
+    """
+    Recorded ee.data responses, stored as gzipped JSON at path.
+    A replay cassette without a path answers only the algorithm list (see offline_entries),
+    so graphs can be built and tests run with neither credentials nor a recording.
+
+    record: requests go to Earth Engine (which must already be initialized) and their
+            responses are appended; save() writes the file.
+    replay: requests are answered from the file in the order they were recorded; a request
+            seen more often than recorded gets the last response again. Unknown requests
+            raise CassetteMiss. No network or credentials are needed.
+
+    counts holds the number of requests per call made while the cassette was in use.
+    """
+
+    def __init__(self, path=None, mode="replay"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.entries = {}
+        self.counts = Counter()
+        self._cursor = Counter()
+        self._originals = {}
+        self._lock = threading.Lock()
+        if mode == "record" and path is None:
+            raise ValueError("a recording needs a path")
+        if mode == "replay" and path is None:
+            self.entries = offline_entries()
+        elif mode == "replay":
+            with gzip.open(path, "rt") as f:
+                stored = json.load(f)
+            if stored.get("version") != CASSETTE_VERSION:
+                raise ValueError(f"{path}: unsupported cassette version {stored.get('version')}")
+            self.entries = stored["entries"]
+
+    def save(self):
+        with self._lock:
+            payload = {"version": CASSETTE_VERSION, "entries": self.entries}
+        with gzip.open(self.path, "wt") as f:
+            json.dump(payload, f)
+
+    def _record(self, call, original):
+        def wrapper(*args):
+            response = original(*args)
+            key = request_key(call, *args)
+            with self._lock:
+                self.counts[call] += 1
+                self.entries.setdefault(key, {"call": call, "responses": []})["responses"].append(
+                    _encode(call, response)
+                )
+            return response
+        return wrapper
+
+    def _replay(self, call):
+        def wrapper(*args):
+            key = request_key(call, *args)
+            with self._lock:
+                self.counts[call] += 1
+                entry = self.entries.get(key)
+                if entry is None:
+                    raise CassetteMiss(f"{call} request {key} is not in cassette {self.path or '(offline)'}")
+                responses = entry["responses"]
+                payload = responses[min(self._cursor[key], len(responses) - 1)]
+                self._cursor[key] += 1
+            return _decode(call, payload)
+        return wrapper
+
+    def __enter__(self):
+        for call in RECORDED_CALLS:
+            self._originals[call] = getattr(ee.data, call)
+
+        if self.mode == "record":
+            for call in RECORDED_CALLS:
+                setattr(ee.data, call, self._record(call, self._originals[call]))
+            # The algorithm list is fetched once at initialization; store it for replay
+            ee.data.getAlgorithms()
+            return self
+
+        for call in RECORDED_CALLS:
+            setattr(ee.data, call, self._replay(call))
+        # Initialize the client offline from the recorded algorithm list
+        self._originals["_install_cloud_api_resource"] = ee.data._install_cloud_api_resource
+        self._originals["_FetchDataCatalogStac"] = ee.deprecation._FetchDataCatalogStac
+        ee.data._install_cloud_api_resource = lambda: None
+        ee.deprecation._FetchDataCatalogStac = lambda: {}
+        ee.Reset()
+        ee.Initialize(None, project=REPLAY_PROJECT)
+        return self
+
+    def __exit__(self, *exc):
+        if self.mode == "replay":
+            ee.Reset()
+            ee.deprecation._FetchDataCatalogStac = self._originals.pop("_FetchDataCatalogStac")
+            ee.data._install_cloud_api_resource = self._originals.pop("_install_cloud_api_resource")
+        for call, original in self._originals.items():
+            setattr(ee.data, call, original)
+        self._originals.clear()
+        if self.mode == "record" and exc[0] is None:
+            self.save()
+        return False
@@ -0,0 +1,92 @@
+import time
+import random
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+import ee
+from utils import tracing
+
+
+# Concurrency cap for Earth Engine requests from this process
+MAX_CONCURRENT_REQUESTS = 6
+# Per-request timeout (seconds), applied to the HTTP call and to waiting on its future
+REQUEST_TIMEOUT = 300
+# Exponential backoff for rate-limit / quota errors
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 32.0
+
+_RETRYABLE_MESSAGES = (
+    "429",
+    "too many requests",
+    "too many concurrent",
+    "rate limit",
+    "quota",
+    "resource exhausted",
+    "service unavailable",
+)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def is_retryable(exc):
+    """True for EE errors caused by rate limits, quotas or temporary unavailability."""
+    message = str(exc).lower()
+    return isinstance(exc, ee.EEException) and any(m in message for m in _RETRYABLE_MESSAGES)
+
+
+def call_with_retries(fn, *args, **kwargs):
+    """Call fn, retrying rate-limit errors with jittered exponential backoff."""
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return fn(*args, **kwargs)
+        except Exception as exc:
+            if attempt == MAX_RETRIES or not is_retryable(exc):
+                raise
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+            time.sleep(delay * random.uniform(0.5, 1.0))
+
+
+def get_executor():
+    """Process-wide thread pool shared by all sessions."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            if ee.data.is_initialized():
+                ee.data.setDeadline(REQUEST_TIMEOUT * 1000)
+            _executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS, thread_name_prefix="ee-request")
+        return _executor
+
+
+def submit(fn, *args, **kwargs):
+    """
+    Run fn(*args, **kwargs) on the pool; returns a Future. Jobs are not retried as a whole:
+    each request inside them retries on its own (get_info, call_with_retries).
+    """
+    # The worker runs in a copy of the caller's context so its requests land in the caller's tracing span
+    return get_executor().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def get_info(obj):
+    """Blocking getInfo() with retries, on the calling thread."""
+    result = call_with_retries(obj.getInfo)
+    tracing.record_request(result)
+    return result
+
+
+def get_info_async(obj):
+    """Start obj.getInfo() on the pool; returns a Future."""
+    return submit(get_info, obj)
+
+
+def gather(futures, timeout=REQUEST_TIMEOUT):
+    """
+    Wait for a future, a list of futures or a dict of futures and return their results
+    in the same shape. Raises concurrent.futures.TimeoutError if one takes longer than timeout.
+    """
+    if isinstance(futures, dict):
+        return {name: f.result(timeout=timeout) for name, f in futures.items()}
+    if isinstance(futures, (list, tuple)):
+        return [f.result(timeout=timeout) for f in futures]
+    return futures.result(timeout=timeout)
@@ -4,373 +4,135 @@ import geemap
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from utils.config import load_assets
-
-
-def get_time_series(aoi, start_date, end_date):
-
-    assets = load_assets()
-    points = assets["points"]
-
-    startDate = ee.Date(str(start_date))
-    endDate = ee.Date(str(end_date))
-
-    # Creates a list of dekads (12-day periods per month) from the given date range
-    # Calculates the number of months between startDate and endDate
-    # Creates a list of months starting from startDate
-    numMonths = endDate.difference(startDate, 'month').round()
-
-    def func_ocb(month):
-        return startDate.advance(ee.Number(month), 'month')
-
-    monthSequence = ee.List.sequence(0, numMonths, 1).map(func_ocb)
-
-    # Function to generate dekad dates for a given month
-
-    def func_jha(date):
-        date = ee.Date(date)
-        y = date.get('year')
-        m = date.get('month')
-
-        dekad1 = ee.Date.fromYMD(y, m, 1)
-        dekad2 = ee.Date.fromYMD(y, m, 13)
-        dekad3 = ee.Date.fromYMD(y, m, 25)
-
-        return [dekad1, dekad2, dekad3]
-
-    generateDekads = func_jha
-
-    # Get the dekadList
-    dekadList = monthSequence.map(generateDekads).flatten()
-
-    def func_kbb(date):
-        return ee.Algorithms.If(
-        ee.Date(date).millis().lte(endDate.millis()),
-        date,
-        None
-        )
-
-    filteredDekadList = dekadList.map(func_kbb).removeAll([None])
-
-    # Remove duplicate dekad dates from filteredDekadList
-    filteredDekadList = filteredDekadList.distinct()
-
-    # Define the Lee filter function for GEE
-    def lee_filter_gee(img, n=2, ENL=5.0):
-        """
-        Lee Filter for speckle reduction in GEE.
-        """
-        img = ee.Image(img)
-        kernel = ee.Kernel.square(radius=n, units='pixels', normalize=True)
-
-        # Local mean and variance
-        mean_img = img.reduceNeighborhood(reducer=ee.Reducer.mean(), kernel=kernel)
-        var_img = img.reduceNeighborhood(reducer=ee.Reducer.variance(), kernel=kernel)
-
-        sigma_v = ee.Number(1.0).divide(ENL).sqrt()  # (1/ENL)^0.5
-        sigma_v2 = sigma_v.pow(2)
-
-        var_x = var_img.subtract(mean_img.pow(2).multiply(sigma_v2)) \
-                    .divide(ee.Number(1).add(sigma_v2))
-        k = var_x.divide(var_img)
-        k = k.where(k.lt(0), 0)
-
-        lee_img = mean_img.add(k.multiply(img.subtract(mean_img)))
-
-        # Explicitly ensure output is an ee.Image
-        return ee.Image(lee_img).copyProperties(img, img.propertyNames())
-
-    # Define polarization
-    polarization = 'VH'
-
-    # Load the Sentinel-1 GRD ImageCollection with raw SAR images (VV, VH)
-    s1 = ee.ImageCollection('COPERNICUS/S1_GRD_FLOAT') \
-        .filterBounds(aoi) \
-        .filterDate(startDate, endDate) \
-        .filter(ee.Filter.eq('instrumentMode','IW')) \
-        .filter(ee.Filter.listContains('transmitterReceiverPolarisation', polarization)) \
-        .filter(ee.Filter.eq('resolution_meters', 10))
-
-    # Apply Lee filter to raw bands
-    def filter_raw(img):
-        img = ee.Image(img)
-        vv_f = ee.Image(lee_filter_gee(img.select('VV'), n=2, ENL=4.0)).rename('VV_filtered')
-        vh_f = ee.Image(lee_filter_gee(img.select('VH'), n=2, ENL=4.0)).rename('VH_filtered')
-        return img.addBands([vv_f, vh_f])
-
-    s1_filtered = s1.map(filter_raw)
-
-    # Calculate mRVI from filtered bands
-    def add_mrvi(img):
-        vv = img.select('VV_filtered')
-        vh = img.select('VH_filtered')
-        mRVI = vv.divide(vv.add(vh)).pow(0.5).multiply(vh.multiply(4).divide(vv.add(vh))).rename('mRVI')
-        return img.addBands(mRVI)
-
-    rvi_filtered = s1_filtered.map(add_mrvi).select('mRVI')
-    rvi_sorted = rvi_filtered.sort("system:time_start")
-
-    def func_wxd(dekad):
-        start_date = ee.Date(dekad)
-        currentIndex = ee.Number(filteredDekadList.indexOf(dekad))
-        nextIndex = currentIndex.add(1)
-        nextDate = ee.Algorithms.If(
-            nextIndex.lt(filteredDekadList.size()),
-            ee.Date(filteredDekadList.get(nextIndex)),
-            endDate
-        )
-
-        dekadImages = rvi_sorted.filterDate(start_date, nextDate)
-        mRVIImages = dekadImages.select('mRVI')
-
-        def make_image():
-            img = mRVIImages.reduce(ee.Reducer.median())
-            # Set dekad and system:time_start correctly
-            return img.set({
-                'dekad': dekad,
-                'system:time_start': start_date.millis()
-            })
-
-        return ee.Algorithms.If(
-            mRVIImages.size().gt(0),
-            make_image(),
-            None
-        )
-
-    createMosaic = func_wxd
-
-    # Convert List to ImageCollection & Remove Nulls
-    mosaicImages = ee.List(filteredDekadList.map(createMosaic)).removeAll([None])
-    mosaicCollection = ee.ImageCollection.fromImages(mosaicImages)
-
-    def func_zty(img):
-        # preserve properties
-        img2 = img.multiply(10000).toUint16()
-        return img2.copyProperties(img, ['dekad', 'system:time_start'])
-
-    mosaicCollectionUInt16 = mosaicCollection.map(func_zty)
+from utils import ee_executor, point_cache, tracing
+from utils.config import AOI_REGISTRY, scheme_for_aoi
+from utils.dekad_pipeline import dekad_dates, get_dekad_pipeline
+
+
+@tracing.traced()
+def get_time_series(aoi_path, start_date, end_date, polarization='VH', lee_radius=2, enl=4.0, mosaic_aoi=None):
+    """
+    Sample the dekad mosaics at the sample points of the scheme whose boundary is aoi_path.
+    mosaic_aoi is the pipeline AOI to sample from (default aoi_path); pass config.pipeline_aoi(schemes)
+    so several schemes share one set of mosaics.
+    """
+    points_asset = AOI_REGISTRY[scheme_for_aoi(aoi_path)]["points"]
+    points = ee.FeatureCollection(points_asset)
+
+    # Settled dekads come from the on-disk cache; only the rest is sampled on GEE
+    with tracing.span("time_series.cache_load"):
+        key = point_cache.cache_key(points_asset, aoi_path, polarization, lee_radius, enl)
+        cached_df, cached_dekads = point_cache.load(key)
+
+        dekads = dekad_dates(start_date, end_date)
+        settled, runs = point_cache.plan_fetch(dekads, start_date, end_date, cached_dekads)
+
+    # Missing runs are independent requests: sample them concurrently
+    with tracing.span("time_series.sample"):
+        futures = []
+        for run_start, run_end in runs:
+            # Shared dekad mosaics (reused by Rice Mapping for the same AOI and dates)
+            pipeline = get_dekad_pipeline(mosaic_aoi or aoi_path, run_start, run_end, polarization, lee_radius, enl)
+            futures.append(ee_executor.submit(fetch_point_rows, pipeline.mosaicCollectionUInt16, points))
+        fetched = ee_executor.gather(futures)
+        fetched_df = pd.concat(fetched, ignore_index=True) if fetched else point_cache.empty_frame()
+
+    # Persist newly settled dekads (dekads without any scene are recorded too)
+    with tracing.span("time_series.cache_save"):
+        new_dekads = settled - cached_dekads
+        if new_dekads:
+            new_rows = fetched_df[fetched_df["time"].dt.date.isin(new_dekads)]
+            point_cache.save(key, pd.concat([cached_df, new_rows], ignore_index=True), cached_dekads | new_dekads)
+
+    with tracing.span("time_series.split"):
+        from_cache = cached_df[cached_df["time"].dt.date.isin(settled & cached_dekads)]
+        df = pd.concat([from_cache, fetched_df], ignore_index=True)
+        return split_point_frames(df)
+
+
+@tracing.traced()
+def fetch_point_rows(mosaicCollectionUInt16, points):
+    """Sample every dekad mosaic at every point in a single request; rows of (time, point_id, mRVI_median)."""
+    # Carry a stable point id through sampling (feature ids change per image after flatten)
+    points_with_id = points.map(lambda f: f.set('point_id', f.id()))
+
+    def sample_image(image):
+        time = ee.Date(image.get('system:time_start')).format('YYYY-MM-dd')
+        return image.sampleRegions(collection=points_with_id, properties=['point_id'], scale=10, geometries=False) \
+            .map(lambda f: f.set('time', time))
+
+    sampled_fc = mosaicCollectionUInt16.map(sample_image).flatten()
+
+    # Fetch only the three columns instead of full GeoJSON features
+    rows = ee_executor.get_info(sampled_fc.reduceColumns(
+        reducer=ee.Reducer.toList(3),
+        selectors=['time', 'point_id', 'mRVI_median']
+    ).get('list'))
+
+    with tracing.span("time_series.parse"):
+        if not rows:
+            return point_cache.empty_frame()
+        df = pd.DataFrame(rows, columns=point_cache.COLUMNS)
+        df["time"] = pd.to_datetime(df["time"])
+        return df
+
+
+def split_point_frames(df):
+    """Build (df_line, df_points) from one table of sampled rows."""
+    df = df.sort_values(["time", "point_id"]).reset_index(drop=True)
 
     #................................................Line Graph................................................#
-    def sample_image(image, fc):
-            fc = ee.FeatureCollection(fc)
-            samples = image.sampleRegions(collection=points, scale=10, geometries=True)
-            samples = samples.map(lambda f: f.set('time', ee.Date(image.get('system:time_start')).format('YYYY-MM-dd')))
-            return fc.merge(samples)
-
-    initial_fc = ee.FeatureCollection([])
-    sampled_fc = ee.FeatureCollection(mosaicCollectionUInt16.iterate(sample_image, initial_fc))
-
-    info1 = sampled_fc.getInfo()
-    rows1 = [{
-        "time": f["properties"].get("time"),
-        "mRVI": f["properties"].get("mRVI_median"),
-        "point_id": f["properties"].get("system:index")
-    } for f in info1["features"]]
-    df_line = pd.DataFrame(rows1)
-    df_line["time"] = pd.to_datetime(df_line["time"])
-    df_line = df_line.sort_values("time")
+    df_line = df.rename(columns={"mRVI_median": "mRVI"})[["time", "mRVI", "point_id"]]
 
     #................................................Point Graph................................................#
-    def sample_image_points(image):
-        return image.sampleRegions(collection=points, scale=10, geometries=True)\
-            .map(lambda f: f.set('time', image.date().format('YYYY-MM-dd')))
-
-    sampled_fc2 = mosaicCollectionUInt16.map(sample_image_points).flatten()
-    info2 = sampled_fc2.getInfo()
-    rows2 = [{
-        "time": f["properties"].get("time"),
-        "mRVI_median": f["properties"].get("mRVI_median"),
-        "point_id": f.get("id")
-    } for f in info2["features"]]
-    df_points = pd.DataFrame(rows2).dropna()
-    df_points["time"] = pd.to_datetime(df_points["time"])
-    df_points = df_points.sort_values("time")
+    df_points = df[["time", "mRVI_median", "point_id"]].dropna()
 
     return df_line, df_points
 
 
-def get_mosaic_collection(aoi, start_date, end_date):
-
-    startDate = ee.Date(str(start_date))
-    endDate = ee.Date(str(end_date))
-
-    # Creates a list of dekads (12-day periods per month) from the given date range
-    # Calculates the number of months between startDate and endDate
-    # Creates a list of months starting from startDate
-    numMonths = endDate.difference(startDate, 'month').round()
-
-    def func_ocb(month):
-        return startDate.advance(ee.Number(month), 'month')
-
-    monthSequence = ee.List.sequence(0, numMonths, 1).map(func_ocb)
-
-    # Function to generate dekad dates for a given month
-
-    def func_jha(date):
-        date = ee.Date(date)
-        y = date.get('year')
-        m = date.get('month')
-
-        dekad1 = ee.Date.fromYMD(y, m, 1)
-        dekad2 = ee.Date.fromYMD(y, m, 13)
-        dekad3 = ee.Date.fromYMD(y, m, 25)
-
-        return [dekad1, dekad2, dekad3]
-
-    generateDekads = func_jha
-
-    # Get the dekadList
-    dekadList = monthSequence.map(generateDekads).flatten()
-
-    def func_kbb(date):
-        return ee.Algorithms.If(
-        ee.Date(date).millis().lte(endDate.millis()),
-        date,
-        None
-        )
-
-    filteredDekadList = dekadList.map(func_kbb).removeAll([None])
-
-    # Remove duplicate dekad dates from filteredDekadList
-    filteredDekadList = filteredDekadList.distinct()
-
-    # Define the Lee filter function for GEE
-    def lee_filter_gee(img, n=2, ENL=5.0):
-        """
-        Lee Filter for speckle reduction in GEE.
-        """
-        img = ee.Image(img)
-        kernel = ee.Kernel.square(radius=n, units='pixels', normalize=True)
-
-        # Local mean and variance
-        mean_img = img.reduceNeighborhood(reducer=ee.Reducer.mean(), kernel=kernel)
-        var_img = img.reduceNeighborhood(reducer=ee.Reducer.variance(), kernel=kernel)
-
-        sigma_v = ee.Number(1.0).divide(ENL).sqrt()  # (1/ENL)^0.5
-        sigma_v2 = sigma_v.pow(2)
-
-        var_x = var_img.subtract(mean_img.pow(2).multiply(sigma_v2)) \
-                    .divide(ee.Number(1).add(sigma_v2))
-        k = var_x.divide(var_img)
-        k = k.where(k.lt(0), 0)
-
-        lee_img = mean_img.add(k.multiply(img.subtract(mean_img)))
-
-        # Explicitly ensure output is an ee.Image
-        return ee.Image(lee_img).copyProperties(img, img.propertyNames())
-
-    # Define polarization
-    polarization = 'VH'
-
-    # Load the Sentinel-1 GRD ImageCollection with raw SAR images (VV, VH)
-    s1 = ee.ImageCollection('COPERNICUS/S1_GRD_FLOAT') \
-        .filterBounds(aoi) \
-        .filterDate(startDate, endDate) \
-        .filter(ee.Filter.eq('instrumentMode','IW')) \
-        .filter(ee.Filter.listContains('transmitterReceiverPolarisation', polarization)) \
-        .filter(ee.Filter.eq('resolution_meters', 10))
-
-    # Apply Lee filter to raw bands
-    def filter_raw(img):
-        img = ee.Image(img)
-        vv_f = ee.Image(lee_filter_gee(img.select('VV'), n=2, ENL=4.0)).rename('VV_filtered')
-        vh_f = ee.Image(lee_filter_gee(img.select('VH'), n=2, ENL=4.0)).rename('VH_filtered')
-        return img.addBands([vv_f, vh_f])
-
-    s1_filtered = s1.map(filter_raw)
-
-    # Calculate mRVI from filtered bands
-    def add_mrvi(img):
-        vv = img.select('VV_filtered')
-        vh = img.select('VH_filtered')
-        mRVI = vv.divide(vv.add(vh)).pow(0.5).multiply(vh.multiply(4).divide(vv.add(vh))).rename('mRVI')
-        return img.addBands(mRVI)
-
-    rvi_filtered = s1_filtered.map(add_mrvi).select('mRVI')
-    rvi_sorted = rvi_filtered.sort("system:time_start")
-
-    def func_wxd(dekad):
-        start_date = ee.Date(dekad)
-        currentIndex = ee.Number(filteredDekadList.indexOf(dekad))
-        nextIndex = currentIndex.add(1)
-        nextDate = ee.Algorithms.If(
-            nextIndex.lt(filteredDekadList.size()),
-            ee.Date(filteredDekadList.get(nextIndex)),
-            endDate
+def sample_point_series(mosaicCollectionUInt16, points):
+    """
+    Sample every dekad mosaic at every point in a single request.
+    Returns (df_line, df_points) built on the client from the same result.
+    """
+    return split_point_frames(fetch_point_rows(mosaicCollectionUInt16, points))
+
+
+def get_mosaic_collection(aoi_path, start_date, end_date):
+    pipeline = get_dekad_pipeline(aoi_path, start_date, end_date)
+    return pipeline.mosaicCollectionUInt16, pipeline.filteredDekadList
+
+
+@tracing.traced()
+def compute_statistics(aoi, maskedPaddyClassification, maskedStartMonthDay):
+    """
+    Total, by-month and by-MMDD paddy area (ha) from a single grouped reduction.
+    Paddy pixels without a start date fall in group 0 and only count towards the total.
+    """
+    # Paddy pixel area, grouped by start MMDD
+    with tracing.span("statistics.reduce"):
+        area_by_mmdd = ee_executor.get_info(
+            ee.Image.pixelArea().updateMask(maskedPaddyClassification)
+            .addBands(maskedStartMonthDay.unmask(0).toInt())
+            .reduceRegion(
+                reducer=ee.Reducer.sum().group(groupField=1, groupName='mmdd'),
+                geometry=aoi,
+                scale=10,
+                maxPixels=1e13
+            )
         )
+    area_ha = {int(g["mmdd"]): g["sum"] / 10000 for g in area_by_mmdd.get("groups", [])}  # m² → ha
 
-        dekadImages = rvi_sorted.filterDate(start_date, nextDate)
-        mRVIImages = dekadImages.select('mRVI')
-
-        def make_image():
-            img = mRVIImages.reduce(ee.Reducer.median())
-            # Set dekad and system:time_start correctly
-            return img.set({
-                'dekad': dekad,
-                'system:time_start': start_date.millis()
-            })
-
-        return ee.Algorithms.If(
-            mRVIImages.size().gt(0),
-            make_image(),
-            None
-        )
-
-    createMosaic = func_wxd
-
-    # Convert List to ImageCollection & Remove Nulls
-    mosaicImages = ee.List(filteredDekadList.map(createMosaic)).removeAll([None])
-    mosaicCollection = ee.ImageCollection.fromImages(mosaicImages)
-
-    def func_zty(img):
-        # preserve properties
-        img2 = img.multiply(10000).toUint16()
-        return img2.copyProperties(img, ['dekad', 'system:time_start'])
-
-    mosaicCollectionUInt16 = mosaicCollection.map(func_zty)
-
-    return mosaicCollectionUInt16, filteredDekadList
-
-
-def compute_statistics(aoi, maskedPaddyClassification, maskedStartMonth, maskedStartMonthDay):
-
-    total_area = (
-        maskedPaddyClassification.multiply(ee.Image.pixelArea())
-        .reduceRegion(
-            reducer=ee.Reducer.sum(),
-            geometry=aoi,
-            scale=10,
-            maxPixels=1e13
-        )
-        .getInfo()
-    )
-    total_area_ha = list(total_area.values())[0] / 10000  # convert m² → ha
-
-    # --- Area by Month
-    month_area = (
-        ee.Image.pixelArea().addBands(maskedStartMonth)
-        .reduceRegion(
-            reducer=ee.Reducer.sum().group(groupField=1, groupName='month'),
-            geometry=aoi,
-            scale=10,
-            maxPixels=1e13
-        )
-        .getInfo()
-    )
-    month_stats = {g["month"]: g["sum"] / 10000 for g in month_area["groups"]}
+    # --- Total area: every paddy pixel
+    total_area_ha = sum(area_ha.values())
 
     # --- Area by MMDD
-    mmdd_area = (
-        ee.Image.pixelArea().addBands(maskedStartMonthDay)
-        .reduceRegion(
-            reducer=ee.Reducer.sum().group(groupField=1, groupName='mmdd'),
-            geometry=aoi,
-            scale=10,
-            maxPixels=1e13
-        )
-        .getInfo()
-    )
-    mmdd_stats = {g["mmdd"]: g["sum"] / 10000 for g in mmdd_area["groups"]}
+    mmdd_stats = {mmdd: area for mmdd, area in area_ha.items() if mmdd != 0}
+
+    # --- Area by Month (derived from MMDD on the client)
+    month_stats = {}
+    for mmdd, area in mmdd_stats.items():
+        month_stats[mmdd // 100] = month_stats.get(mmdd // 100, 0) + area
 
     return total_area_ha, month_stats, mmdd_stats
 
@@ -0,0 +1,202 @@
+# Local NumPy counterpart of the Earth Engine dekad-mosaic chain (utils/dekad_pipeline.py)
+import warnings
+import numpy as np
+import pandas as pd
+from utils.dekad_pipeline import dekad_dates
+
+
+# ---------------- Sliding-window statistics ----------------
+def _window_sum(a, n):
+    """Sum over a (2n+1)x(2n+1) window on the last two axes using an integral image."""
+    H, W = a.shape[-2:]
+    c = np.cumsum(np.cumsum(a, axis=-2), axis=-1)
+    c = np.pad(c, [(0, 0)] * (a.ndim - 2) + [(1, 0), (1, 0)])
+
+    rows, cols = np.arange(H), np.arange(W)
+    r0 = np.clip(rows - n, 0, H)[:, None]
+    r1 = np.clip(rows + n + 1, 0, H)[:, None]
+    c0 = np.clip(cols - n, 0, W)[None, :]
+    c1 = np.clip(cols + n + 1, 0, W)[None, :]
+
+    return c[..., r1, c1] - c[..., r0, c1] - c[..., r1, c0] + c[..., r0, c0]
+
+
+def local_mean_var(stack, n=2):
+    """
+    Local mean and (population) variance in a square window of radius n,
+    like reduceNeighborhood with a normalized square kernel.
+    NaN pixels are treated as masked: they are left out of the window statistics.
+    """
+    stack = np.asarray(stack, dtype=np.float64)
+    valid = np.isfinite(stack)
+    values = np.where(valid, stack, 0.0)
+
+    count = _window_sum(valid.astype(np.float64), n)
+    total = _window_sum(values, n)
+    total_sq = _window_sum(values * values, n)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+        var = np.maximum(total_sq / count - mean * mean, 0.0)
+
+    mean[count == 0] = np.nan
+    var[count == 0] = np.nan
+    return mean, var
+
+
+# ---------------- Lee filter & mRVI ----------------
+def lee_filter(stack, n=2, enl=5.0):
+    """
+    Lee speckle filter on a (..., y, x) stack; same formula as lee_filter_gee.
+    Where the local variance is zero the gain is taken as 0 (output = local mean).
+    """
+    stack = np.asarray(stack, dtype=np.float64)
+    mean, var = local_mean_var(stack, n)
+
+    sigma_v2 = 1.0 / enl  # ((1/ENL)^0.5)^2
+    var_x = (var - mean ** 2 * sigma_v2) / (1.0 + sigma_v2)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        k = np.where(var > 0, var_x / var, 0.0)
+    k = np.where(k < 0, 0.0, k)
+
+    out = mean + k * (stack - mean)
+    out[~np.isfinite(stack)] = np.nan
+    return out
+
+
+def mrvi(vv, vh):
+    """mRVI = sqrt(VV / (VV + VH)) * 4 VH / (VV + VH), broadcast over any shape."""
+    vv = np.asarray(vv, dtype=np.float64)
+    vh = np.asarray(vh, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        total = vv + vh
+        return np.sqrt(vv / total) * (vh * 4 / total)
+
+
+def to_uint16(values):
+    """img.multiply(10000).toUint16(): scale, clamp to the uint16 range and truncate; NaN becomes masked."""
+    values = np.asarray(values, dtype=np.float64)
+    masked = ~np.isfinite(values)
+    scaled = np.clip(np.where(masked, 0.0, values) * 10000, 0, np.iinfo(np.uint16).max)
+    return np.ma.MaskedArray(scaled.astype(np.uint16), mask=masked)
+
+
+# ---------------- Dekad median compositing ----------------
+def _to_millis(times):
+    return pd.to_datetime(pd.Series(times)).to_numpy(dtype="datetime64[ms]").astype(np.int64)
+
+
+def dekad_median(stack, times, start_date, end_date):
+    """
+    Median of a (time, y, x) stack per dekad window (func_wxd).
+    Windows are [dekad, next dekad), the last one ends at end_date; scenes outside
+    [start_date, end_date) are ignored and dekads without scenes are dropped.
+    Returns (mosaics (D, y, x) float, dekad start dates).
+    """
+    stack = np.asarray(stack, dtype=np.float64)
+    t = _to_millis(times)
+
+    dekads = dekad_dates(start_date, end_date)
+    if not dekads:
+        return np.empty((0,) + stack.shape[1:]), []
+
+    edges = _to_millis(dekads + [pd.to_datetime(str(end_date)).date()])
+    start_ms, end_ms = _to_millis([str(start_date), str(end_date)])
+
+    group = np.searchsorted(edges, t, side="right") - 1
+    keep = (t >= start_ms) & (t < end_ms) & (group >= 0) & (group < len(dekads))
+    group, scenes = group[keep], stack[keep]
+
+    counts = np.bincount(group, minlength=len(dekads))
+    present = np.flatnonzero(counts)
+    if present.size == 0:
+        return np.empty((0,) + stack.shape[1:]), []
+
+    # Pad every dekad to the same number of scenes with NaN, then one nanmedian over that axis
+    order = np.argsort(group, kind="stable")
+    group, scenes = group[order], scenes[order]
+    rank = np.arange(group.size) - np.searchsorted(group, group, side="left")
+
+    padded = np.full((len(dekads), counts.max()) + stack.shape[1:], np.nan)
+    padded[group, rank] = scenes
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN pixels stay NaN (masked)
+        medians = np.nanmedian(padded[present], axis=1)
+
+    return medians, [dekads[i] for i in present]
+
+
+def mosaic_stack(vv, vh, times, start_date, end_date, lee_radius=2, enl=4.0):
+    """
+    Full local chain on (time, y, x) VV/VH stacks: Lee filter -> mRVI -> dekad median -> uint16 x10000.
+    Returns (masked uint16 mosaics (D, y, x), dekad start dates), like mosaicCollectionUInt16.
+    """
+    vv_f = lee_filter(vv, n=lee_radius, enl=enl)
+    vh_f = lee_filter(vh, n=lee_radius, enl=enl)
+    medians, dekads = dekad_median(mrvi(vv_f, vh_f), times, start_date, end_date)
+    return to_uint16(medians), dekads
+
+
+# ---------------- Longest growth streak ----------------
+def sequential_growth_stack(mosaics, dekads):
+    """
+    Sequential growth flags from dekad mosaics (findSequentialGrowth + func_wun).
+    Flag k is set where mosaic k -> k+1 and k+1 -> k+2 both increase; its start time is dekad k.
+    Masked pixels count as no growth. Returns ((D-2, y, x) bool, start dates).
+    """
+    values = np.ma.filled(np.ma.asarray(mosaics).astype(np.int32), 0)
+    mask = np.ma.getmaskarray(mosaics)
+
+    positive = (np.diff(values, axis=0) > 0) & ~mask[1:] & ~mask[:-1]
+    growth = positive[:-1] & positive[1:]
+    return growth, list(dekads[:growth.shape[0]])
+
+
+def _streak_tile(growth):
+    """Longest run of True along axis 0 and the index where it starts (earliest run on ties)."""
+    counts = np.cumsum(growth, axis=0, dtype=np.int32)
+    # Cumulative count at the last False step; subtracting it resets the count after each gap
+    last_reset = np.maximum.accumulate(np.where(growth, 0, counts), axis=0)
+    runs = counts - last_reset
+
+    longest = runs.max(axis=0)
+    end = runs.argmax(axis=0)  # first step where the longest length is reached
+    return longest, end - longest + 1
+
+
+def longest_growth_streak(growth, start_times, tile_size=512):
+    """
+    Local equivalent of the func_hxg iterate on a (T, H, W) growth stack.
+    Processes the raster in tile_size x tile_size blocks so memory stays bounded.
+    Returns dict of (H, W) arrays: length, start_millis, start_month, start_mmdd (0 where no streak).
+    """
+    T, H, W = growth.shape
+    start_ms = _to_millis(start_times)
+    stamps = pd.to_datetime(start_ms, unit="ms")
+    month_lut = np.asarray(stamps.month, dtype=np.int16)
+    mmdd_lut = np.asarray(stamps.month * 100 + stamps.day, dtype=np.int16)
+
+    out = {
+        "length": np.zeros((H, W), dtype=np.int32),
+        "start_millis": np.zeros((H, W), dtype=np.int64),
+        "start_month": np.zeros((H, W), dtype=np.int16),
+        "start_mmdd": np.zeros((H, W), dtype=np.int16),
+    }
+    if T == 0:
+        return out
+
+    for y0 in range(0, H, tile_size):
+        for x0 in range(0, W, tile_size):
+            block = (slice(y0, y0 + tile_size), slice(x0, x0 + tile_size))
+            longest, start = _streak_tile(np.asarray(growth[(slice(None),) + block], dtype=bool))
+
+            has_streak = longest > 0
+            start = np.where(has_streak, start, 0)
+            out["length"][block] = longest
+            out["start_millis"][block] = np.where(has_streak, start_ms[start], 0)
+            out["start_month"][block] = np.where(has_streak, month_lut[start], 0)
+            out["start_mmdd"][block] = np.where(has_streak, mmdd_lut[start], 0)
+
+    return out
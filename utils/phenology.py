@@ -0,0 +1,100 @@
+# Per-point season phenology (SOS, peak, harvest) from the sample point mRVI series
+import numpy as np
+import pandas as pd
+from scipy.ndimage import median_filter
+from scipy.signal import savgol_filter
+from utils import tracing
+
+
+SMOOTHING_METHODS = ("savgol", "median")
+# Smoothing window in dekads (odd); shortened automatically for short series
+SMOOTH_WINDOW = 5
+SAVGOL_POLYORDER = 2
+# Harvest: first dekad after the peak where mRVI has lost this fraction of the SOS-to-peak rise
+HARVEST_DROP = 0.5
+# Points whose SOS-to-peak rise is below this fraction of the median rise do not vote
+MIN_AMPLITUDE_FRACTION = 0.5
+
+STAGES = ("start", "peak", "harvest")
+
+
+def point_matrix(df_points, value_col="mRVI_median"):
+    """(P, T) array of point values by dekad, gaps filled along time; returns (values, times, point ids)."""
+    wide = df_points.assign(time=pd.to_datetime(df_points["time"])) \
+        .pivot_table(index="point_id", columns="time", values=value_col, aggfunc="mean") \
+        .sort_index(axis=1)
+    wide = wide.interpolate(axis=1, limit_direction="both")
+    return wide.to_numpy(dtype=float), wide.columns, wide.index
+
+
+def smooth(values, method="savgol", window=SMOOTH_WINDOW):
+    """Smooth every row of a (P, T) array along time at once."""
+    n_times = values.shape[1]
+    window = min(window, n_times if n_times % 2 else n_times - 1)
+    if method == "median":
+        return median_filter(values, size=(1, max(window, 1)), mode="nearest") if window > 1 else values
+    if method == "savgol":
+        return savgol_filter(values, window, SAVGOL_POLYORDER, axis=1, mode="interp") \
+            if window > SAVGOL_POLYORDER else values
+    raise ValueError(f"unknown smoothing method: {method}")
+
+
+def stage_indices(smoothed):
+    """
+    Per-point time indices of SOS (lowest value before the peak), peak (highest value) and
+    harvest (first dekad after the peak below HARVEST_DROP of the rise, else the lowest after it).
+    Returns (sos, peak, harvest, amplitude) arrays of length P.
+    """
+    n_points, n_times = smoothed.shape
+    t = np.arange(n_times)
+    rows = np.arange(n_points)
+
+    peak = np.argmax(np.where(np.isnan(smoothed), -np.inf, smoothed), axis=1)
+
+    before = np.where(t[None, :] <= peak[:, None], smoothed, np.inf)
+    sos = np.argmin(before, axis=1)
+    amplitude = smoothed[rows, peak] - smoothed[rows, sos]
+
+    after = t[None, :] > peak[:, None]
+    threshold = smoothed[rows, peak] - HARVEST_DROP * amplitude
+    dropped = after & (smoothed <= threshold[:, None])
+    lowest_after = np.argmin(np.where(after, smoothed, np.inf), axis=1)
+    harvest = np.where(dropped.any(axis=1), np.argmax(dropped, axis=1), lowest_after)
+    # A peak on the last dekad has no harvest yet: keep the peak
+    harvest = np.where(after.any(axis=1), harvest, peak)
+    return sos, peak, harvest, amplitude
+
+
+@tracing.traced()
+def detect(df_points, value_col="mRVI_median", method="savgol", window=SMOOTH_WINDOW):
+    """
+    Per-point and consensus season dates.
+
+    Returns (points, consensus): points is a DataFrame indexed by point_id with start, peak,
+    harvest dates, amplitude and a votes flag; consensus maps each stage to
+    {"date", "iqr_days", "points"}: the median date of the voting points (snapped to a dekad)
+    and the interquartile spread of their dates in days.
+    """
+    values, times, point_ids = point_matrix(df_points, value_col)
+    sos, peak, harvest, amplitude = stage_indices(smooth(values, method, window))
+
+    votes = amplitude >= MIN_AMPLITUDE_FRACTION * np.nanmedian(amplitude)
+    if not votes.any():
+        votes = np.ones_like(votes)
+
+    points = pd.DataFrame({
+        "start": times[sos], "peak": times[peak], "harvest": times[harvest],
+        "amplitude": amplitude, "votes": votes,
+    }, index=point_ids)
+
+    day = np.asarray((times - times[0]).days, dtype=float)
+    consensus = {}
+    for stage, idx in zip(STAGES, (sos, peak, harvest)):
+        voted = idx[votes]
+        q1, q3 = np.percentile(day[voted], [25, 75])
+        consensus[stage] = {
+            "date": times[int(np.round(np.median(voted)))],
+            "iqr_days": float(q3 - q1),
+            "points": int(votes.sum()),
+        }
+    return points, consensus
@@ -1,29 +1,26 @@
 # Placeholder for plot_utils.py
-import matplotlib.pyplot as plt
+import matplotlib
 import matplotlib.dates as mdates
 import streamlit as st
 import pandas as pd
 import seaborn as sns
 import numpy as np
 import calendar
+import plotly.graph_objects as go
+from utils import chart_service, tracing
 
 
-# --------------------- Mean + Per-Point Time Series ---------------------
-def plot_time_series(df_line, show=True):
-    """
-    Plot time series of mRVI values for each point and the mean across points.
-    Returns the matplotlib figure object.
-    """
-    st.subheader("Time Series of Mean mRVI at Sample Points")
-    
-    if df_line is None or df_line.empty:
-        st.warning("No data available for time series plot.")
-        return None
+# Interactive (WebGL) point charts: the dekad percentile bands
+PERCENTILE_BANDS = ((0.05, 0.95, "rgba(30, 136, 229, 0.15)"), (0.25, 0.75, "rgba(30, 136, 229, 0.3)"))
+# Above this many points the per-point lines start hidden (toggle them from the legend).
+# A point's series is only a few dozen dekads: the cost is the number of lines, not their length.
+MAX_VISIBLE_LINES = 50
 
-    df_line["time"] = pd.to_datetime(df_line["time"])
-    df_line = df_line.sort_values("time")
 
-    fig1, ax1 = plt.subplots(figsize=(12, 6))
+# --------------------- Mean + Per-Point Time Series ---------------------
+def draw_time_series(fig, df_line, title="Time Series of Mean mRVI at Sample Points"):
+    """Each point's mRVI and the mean across points (chart_service draw function)."""
+    ax1 = fig.subplots()
 
     # Plot each point
     for pid, group in df_line.groupby("point_id"):
@@ -38,19 +35,59 @@ def plot_time_series(df_line, show=True):
     ax1.xaxis.set_major_locator(mdates.AutoDateLocator())
     ax1.set_xlabel("Date")
     ax1.set_ylabel("mRVI Value")
-    ax1.set_title("Time Series of Mean mRVI at Sample Points")
-    plt.xticks(rotation=45)
+    ax1.set_title(title)
+    ax1.tick_params(axis="x", labelrotation=45)
     ax1.legend(bbox_to_anchor=(1.05, 1), loc="upper left", fontsize=8)
-    plt.tight_layout()
+    fig.tight_layout()
+
+
+@tracing.traced()
+def plot_time_series(df_line, show=True, interactive=False):
+    """
+    Plot time series of mRVI values for each point and the mean across points.
+    Returns the rendered PNG bytes, or the Plotly figure when interactive.
+    """
+    st.subheader("Time Series of Mean mRVI at Sample Points")
+    
+    if df_line is None or df_line.empty:
+        st.warning("No data available for time series plot.")
+        return None
 
-    st.pyplot(fig1)
+    if interactive:
+        fig = point_series_figure(df_line, "mRVI", "Time Series of Mean mRVI at Sample Points", mean_line=True)
+        if show:
+            st.plotly_chart(fig, use_container_width=True)
+        return fig
+
+    df_line = df_line.assign(time=pd.to_datetime(df_line["time"])).sort_values("time")
+    png = chart_service.render(draw_time_series, df_line)
+    if show:
+        chart_service.show(png)
+    return png
 
 
 # --------------------- Per-Point mRVI Time Series ---------------------
-def plot_point_series(df_points, show=True):
+def draw_point_series(fig, df_points, title="Time Series of mRVI at Sample Points"):
+    """mRVI median per individual point over time (chart_service draw function)."""
+    ax2 = fig.subplots()
+
+    for pid, group in df_points.groupby("point_id"):
+        ax2.plot(group["time"], group["mRVI_median"], marker="o", linestyle="-", markersize=5, alpha=0.7, label=f"Point {pid}")
+
+    ax2.xaxis.set_major_formatter(mdates.DateFormatter("%Y-%m-%d"))
+    ax2.xaxis.set_major_locator(mdates.AutoDateLocator())
+    ax2.set_xlabel("Date")
+    ax2.set_ylabel("mRVI Value")
+    ax2.set_title(title)
+    ax2.tick_params(axis="x", labelrotation=45)
+    fig.tight_layout()
+
+
+@tracing.traced()
+def plot_point_series(df_points, show=True, interactive=False):
     """
     Plot mRVI values per individual point over time.
-    Returns the matplotlib figure object.
+    Returns the rendered PNG bytes, or the Plotly figure when interactive.
     """
     st.subheader("Time Series of mRVI at Sample Points")
 
@@ -58,29 +95,78 @@ def plot_point_series(df_points, show=True):
         st.warning("No data available for point-wise plot.")
         return None
 
-    df_points["time"] = pd.to_datetime(df_points["time"])
-    df_points = df_points.sort_values("time")
+    if interactive:
+        fig = point_series_figure(df_points, "mRVI_median", "Time Series of mRVI at Sample Points")
+        if show:
+            st.plotly_chart(fig, use_container_width=True)
+        return fig
 
-    fig2, ax2 = plt.subplots(figsize=(12, 6))
+    df_points = df_points.assign(time=pd.to_datetime(df_points["time"])).sort_values("time")
+    png = chart_service.render(draw_point_series, df_points)
+    if show:
+        chart_service.show(png)
+    return png
 
-    for pid, group in df_points.groupby("point_id"):
-        ax2.plot(group["time"], group["mRVI_median"], marker="o", linestyle="-", markersize=5, alpha=0.7, label=f"Point {pid}")
 
-    ax2.xaxis.set_major_formatter(mdates.DateFormatter("%Y-%m-%d"))
-    ax2.xaxis.set_major_locator(mdates.AutoDateLocator())
-    ax2.set_xlabel("Date")
-    ax2.set_ylabel("mRVI Value")
-    ax2.set_title("Time Series of mRVI at Sample Points")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
+# --------------------- Interactive (WebGL) Point Series ---------------------
+def _series_lines(df, value_col):
+    """All point series in one frame, each ended by an empty row so one trace draws them all."""
+    df = df[["point_id", "time", value_col]]
+    breaks = pd.DataFrame({"point_id": df["point_id"].unique(), "time": pd.NaT, value_col: np.nan})
+    lines = pd.concat([df.assign(_break=0), breaks.assign(_break=1)], ignore_index=True)
+    return lines.sort_values(["point_id", "_break", "time"], kind="stable")
+
 
-    st.pyplot(fig2)
+def point_series_figure(df, value_col, title, mean_line=False):
+    """
+    Plotly Scattergl chart of many point series: per-dekad 5-95 and 25-75 percentile bands,
+    the median (and optionally the mean), and every point as part of one line trace.
+    """
+    df = df.assign(time=pd.to_datetime(df["time"]))
+    by_time = df.groupby("time")[value_col]
+    quantiles = by_time.quantile([q for band in PERCENTILE_BANDS for q in band[:2]] + [0.5]).unstack()
+
+    fig = go.Figure()
+    n_points = df["point_id"].nunique()
+    lines = _series_lines(df, value_col)
+    fig.add_trace(go.Scattergl(
+        x=lines["time"], y=lines[value_col], mode="lines",
+        line=dict(width=1, color="rgba(120, 120, 120, 0.35)"),
+        name=f"Points ({n_points})", hoverinfo="skip",
+        visible=True if n_points <= MAX_VISIBLE_LINES else "legendonly",
+    ))
+
+    for lower, upper, color in PERCENTILE_BANDS:
+        fig.add_trace(go.Scattergl(
+            x=quantiles.index, y=quantiles[lower], mode="lines", line=dict(width=0),
+            showlegend=False, hoverinfo="skip",
+        ))
+        fig.add_trace(go.Scattergl(
+            x=quantiles.index, y=quantiles[upper], mode="lines", line=dict(width=0),
+            fill="tonexty", fillcolor=color, name=f"P{lower * 100:.0f}-P{upper * 100:.0f}",
+        ))
+
+    fig.add_trace(go.Scattergl(
+        x=quantiles.index, y=quantiles[0.5], mode="lines+markers",
+        line=dict(color="#1E88E5", width=2), name="Median",
+    ))
+    if mean_line:
+        fig.add_trace(go.Scattergl(
+            x=quantiles.index, y=by_time.mean(), mode="lines+markers",
+            line=dict(color="green", width=2.5), name=f"Mean {value_col}",
+        ))
+
+    fig.update_layout(
+        title=title, xaxis_title="Date", yaxis_title="mRVI Value",
+        height=450, margin=dict(l=10, r=10, t=50, b=10),
+        legend=dict(orientation="h", yanchor="bottom", y=1.0, x=0),
+    )
+    return fig
 
 
 # --------------------- Plot Boxplot ---------------------
-def plot_outlier_boxplot(df_points):
-    """Plot mRVI dispersion and potential outliers."""
-
+def draw_outlier_boxplot(fig, df_points):
+    """Per-dekad boxplot of point mRVI (chart_service draw function)."""
     df_long = df_points.melt(
         id_vars=["time"],
         value_vars=["mRVI_median"],
@@ -90,23 +176,30 @@ def plot_outlier_boxplot(df_points):
     df_long["point"] = df_points["point_id"]
     df_long["time"] = pd.to_datetime(df_long["time"])
 
-    fig, ax = plt.subplots(figsize=(12, 6))
+    ax = fig.subplots()
     sns.boxplot(x="time", y="value", data=df_long, ax=ax)
-    plt.xticks(rotation=45)
+    ax.tick_params(axis="x", labelrotation=45)
     ax.set_xlabel("Date")
     ax.set_ylabel("mRVI Value")
     ax.set_title("mRVI Dispersion and Outlier Analysis at Sample Points")
-    plt.tight_layout()
-    return fig
+    fig.tight_layout()
 
 
-def plot_statistics(month_stats, mmdd_stats, season_start=10):
-    """Plot paddy area statistics as bar and pie charts."""
+@tracing.traced()
+def plot_outlier_boxplot(df_points):
+    """Plot mRVI dispersion and potential outliers; returns the rendered PNG bytes."""
+    return chart_service.render(draw_outlier_boxplot, df_points)
+
+
+# --------------------- Paddy Area Statistics ---------------------
+def stats_frames(month_stats, mmdd_stats, season_start=10):
+    """Month and MMDD area tables in seasonal order, with cumulative areas."""
     seasonal_order = [(season_start + i - 1) % 12 + 1 for i in range(12)]
 
     # --- Month-level DataFrame
     df_month = pd.DataFrame(list(month_stats.items()), columns=["Month", "Area_ha"])
     df_month = df_month[df_month["Month"] != 0]
+    df_month["Month"] = df_month["Month"].astype(int)
     df_month["Month_Name"] = df_month["Month"].apply(lambda x: calendar.month_name[int(x)])
     df_month["Seasonal_Order"] = df_month["Month"].apply(lambda x: seasonal_order.index(int(x)))
     df_month = df_month.sort_values("Seasonal_Order")
@@ -126,91 +219,127 @@ def plot_statistics(month_stats, mmdd_stats, season_start=10):
     df_mmdd["Seasonal_Index"] = df_mmdd["MMDD"].apply(consecutive_day_index)
     df_mmdd = df_mmdd.sort_values("Seasonal_Index")
     df_mmdd["Cumulative_Area_ha"] = df_mmdd["Area_ha"].cumsum()
+    return df_month, df_mmdd
 
-    # --- Plot 1: Bar chart by Month
-    fig_1, ax_1 = plt.subplots(figsize=(8, 6))
-    ax_1.bar(df_month["Month_Name"], df_month["Area_ha"], color="skyblue")
-    ax_1.set_xlabel("Month")
-    ax_1.set_ylabel("Area (ha)")
-    ax_1.set_title("Paddy Area by Month (Seasonal Order)")
-    plt.xticks(rotation=45)
-    st.session_state[f"stats_bar_month"] = fig_1
-
-    # --- Plot 2: Bar chart by MMDD
-    fig_2, ax_2 = plt.subplots(figsize=(10, 6))
-    ax_2.bar(df_mmdd["Month_Day"], df_mmdd["Area_ha"], color="lightgreen")
-    ax_2.set_xlabel("Start Date (MM-DD)")
-    ax_2.set_ylabel("Area (ha)")
-    ax_2.set_title("Paddy Area by Start Date (Seasonal Order)")
-    plt.xticks(rotation=90)
-    st.session_state[f"stats_bar_day"] = fig_2
-
-    # --- Plot 3: Pie chart by Month
-    fig_3, ax_3 = plt.subplots(figsize=(6, 6))
-    wedges, texts, autotexts = ax_3.pie(
-        df_month["Area_ha"],
-        startangle=90,
-        colors=plt.cm.tab20.colors,
-        autopct=lambda pct: f"{pct:.1f}%",
-        pctdistance=0.8,
-        wedgeprops=dict(width=0.5),
-    )
-    ax_3.legend(
-        wedges, df_month["Month_Name"], title="Start Month",
-        loc="center left", bbox_to_anchor=(1, 0, 0.5, 1)
-    )
-    ax_3.set_title("Paddy Area % by Month (Seasonal Order)")
-    st.session_state[f"stats_pie_month"] = fig_3
-
-    # --- Plot 4: Pie chart by MMDD
-    labels = df_mmdd["Month_Day"]
-    sizes = df_mmdd["Area_ha"]
-    cmap = plt.cm.viridis(np.linspace(0, 1, len(labels)))
-
-    fig_4, ax_4 = plt.subplots(figsize=(10, 10))
-    wedges, texts, autotexts = ax_4.pie(
-        sizes,
-        labels=None,
+
+def draw_area_bar(fig, df, label_col, xlabel, title, color, rotation=45):
+    ax = fig.subplots()
+    ax.bar(df[label_col], df["Area_ha"], color=color)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel("Area (ha)")
+    ax.set_title(title)
+    ax.tick_params(axis="x", labelrotation=rotation)
+
+
+def draw_area_pie(fig, df, label_col, legend_title, title, cmap, sequential=False, pctdistance=0.8,
+                  edgecolor=None, fontsize=None):
+    """Donut chart of Area_ha; sequential colour maps are sampled once per slice."""
+    colormap = matplotlib.colormaps[cmap]
+    colors = colormap(np.linspace(0, 1, len(df))) if sequential else colormap.colors
+    wedgeprops = dict(width=0.5, edgecolor=edgecolor) if edgecolor else dict(width=0.5)
+
+    ax = fig.subplots()
+    wedges, texts, autotexts = ax.pie(
+        df["Area_ha"],
         startangle=90,
-        colors=cmap,
+        colors=colors,
         autopct=lambda pct: f"{pct:.1f}%",
-        pctdistance=0.85,
-        wedgeprops=dict(width=0.5, edgecolor="w"),
+        pctdistance=pctdistance,
+        wedgeprops=wedgeprops,
     )
-    ax_4.legend(
-        wedges, labels, title="Start Date (MM-DD)",
+    ax.legend(
+        wedges, df[label_col], title=legend_title,
         loc="center left", bbox_to_anchor=(1, 0, 0.5, 1)
     )
-    ax_4.set_title("Paddy Area % by Start Date (Seasonal Order)", fontsize=14)
-    st.session_state[f"stats_pie_day"] = fig_4
-
-    # --- Month-level Bar + Cumulative Line ---
-    fig_5, ax5 = plt.subplots(figsize=(9,6))
-    x = np.arange(len(df_month))
-    ax5.bar(x, df_month["Area_ha"], color="#43A047", width=0.5, alpha=0.8, label="Monthly Area (ha)")
-    ax5.plot(x, df_month["Cumulative_Area_ha"], color="#1E88E5", marker="o", linewidth=2.5, label="Cumulative Area (ha)")
-    ax5.fill_between(x, df_month["Cumulative_Area_ha"], color="#1E88E5", alpha=0.15)
-    ax5.set_xticks(x)
-    ax5.set_xticklabels(df_month["Month_Name"], rotation=45)
-    ax5.set_xlabel("Month")
-    ax5.set_ylabel("Area (ha)")
-    ax5.set_title("Monthly and Cumulative Paddy Area")
-    ax5.grid(axis="y", linestyle="--", alpha=0.5)
-    ax5.legend()
-    st.session_state["stats_combo_month"] = fig_5
-
-    # --- Daily (MM-DD) Bar + Cumulative Line ---
-    fig_6, ax6 = plt.subplots(figsize=(12,6))
-    x = np.arange(len(df_mmdd))
-    ax6.bar(x, df_mmdd["Area_ha"], color="#43A047", width=0.6, alpha=0.8, label="Dekadal Area (ha)")
-    ax6.plot(x, df_mmdd["Cumulative_Area_ha"], color="#1E88E5", marker="o", linewidth=2.5, label="Cumulative Area (ha)")
-    ax6.fill_between(x, df_mmdd["Cumulative_Area_ha"], color="#1E88E5", alpha=0.15)
-    ax6.set_xticks(x)
-    ax6.set_xticklabels(df_mmdd["Month_Day"], rotation=45)
-    ax6.set_xlabel("Start Date (MM-DD)")
-    ax6.set_ylabel("Area (ha)")
-    ax6.set_title("Dekadal and Cumulative Paddy Area")
-    ax6.grid(axis="y", linestyle="--", alpha=0.5)
-    ax6.legend()
-    st.session_state["stats_combo_day"] = fig_6
-
+    ax.set_title(title, fontsize=fontsize)
+
+
+def draw_area_combo(fig, df, label_col, xlabel, title, bar_label, width=0.5,
+                    bar_color="#43A047", line_color="#1E88E5", fill_color="#1E88E5"):
+    """Area bars with the cumulative area as a line."""
+    ax = fig.subplots()
+    x = np.arange(len(df))
+    ax.bar(x, df["Area_ha"], color=bar_color, width=width, alpha=0.8, label=bar_label)
+    ax.plot(x, df["Cumulative_Area_ha"], color=line_color, marker="o", linewidth=2.5, label="Cumulative Area (ha)")
+    ax.fill_between(x, df["Cumulative_Area_ha"], color=fill_color, alpha=0.15)
+    ax.set_xticks(x)
+    ax.set_xticklabels(df[label_col], rotation=45)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel("Area (ha)")
+    ax.set_title(title)
+    ax.grid(axis="y", linestyle="--", alpha=0.5)
+    ax.legend()
+
+
+@tracing.traced()
+def plot_statistics(month_stats, mmdd_stats, season_start=10):
+    """
+    Render the paddy area bar, pie and cumulative charts side by side on the chart pool and
+    keep their PNG bytes in st.session_state (stats_bar_month, stats_pie_day, ...).
+    """
+    df_month, df_mmdd = stats_frames(month_stats, mmdd_stats, season_start)
+
+    charts = {
+        "stats_bar_month": chart_service.submit(
+            draw_area_bar, df_month, "Month_Name", "Month", "Paddy Area by Month (Seasonal Order)",
+            "skyblue", figsize=(8, 6)),
+        "stats_bar_day": chart_service.submit(
+            draw_area_bar, df_mmdd, "Month_Day", "Start Date (MM-DD)", "Paddy Area by Start Date (Seasonal Order)",
+            "lightgreen", rotation=90, figsize=(10, 6)),
+        "stats_pie_month": chart_service.submit(
+            draw_area_pie, df_month, "Month_Name", "Start Month", "Paddy Area % by Month (Seasonal Order)",
+            "tab20", figsize=(6, 6)),
+        "stats_pie_day": chart_service.submit(
+            draw_area_pie, df_mmdd, "Month_Day", "Start Date (MM-DD)", "Paddy Area % by Start Date (Seasonal Order)",
+            "viridis", sequential=True, pctdistance=0.85, edgecolor="w", fontsize=14, figsize=(10, 10)),
+        "stats_combo_month": chart_service.submit(
+            draw_area_combo, df_month, "Month_Name", "Month", "Monthly and Cumulative Paddy Area",
+            "Monthly Area (ha)", figsize=(9, 6)),
+        "stats_combo_day": chart_service.submit(
+            draw_area_combo, df_mmdd, "Month_Day", "Start Date (MM-DD)", "Dekadal and Cumulative Paddy Area",
+            "Dekadal Area (ha)", width=0.6, figsize=(12, 6)),
+    }
+    st.session_state.update({key: future.result() for key, future in charts.items()})
+
+
+
+# --------------------- Debug: Stage Timing Waterfall ---------------------
+def show_trace_panel(trace):
+    """
+    Collapsible debug panel with a timing waterfall of a tracing.Trace.
+    The last trace that recorded any stage is kept per page, so the panel survives plain reruns.
+    """
+    key = f"trace_{trace.name}"
+    if len(trace.spans) > 1:
+        st.session_state[key] = trace.to_dict()
+    if key not in st.session_state:
+        return
+
+    df = pd.DataFrame(st.session_state[key]["spans"])
+    with st.expander("🛠️ Debug: stage timings and Earth Engine requests", expanded=False):
+        fig = go.Figure(go.Bar(
+            y=df.index,
+            x=df["duration_ms"],
+            base=df["start_ms"],
+            orientation="h",
+            marker_color=df["requests"].gt(0).map({True: "#1E88E5", False: "#9E9E9E"}),
+            customdata=df[["name", "requests", "response_bytes", "thread"]],
+            hovertemplate="%{customdata[0]}<br>%{x:,.0f} ms (from %{base:,.0f} ms)"
+                          "<br>%{customdata[1]} EE requests, %{customdata[2]:,} bytes"
+                          "<br>%{customdata[3]}<extra></extra>",
+        ))
+        fig.update_yaxes(
+            tickvals=df.index,
+            ticktext=[" " * d + n for d, n in zip(df["depth"], df["name"])],
+            autorange="reversed",
+        )
+        fig.update_layout(
+            height=max(250, 26 * len(df)),
+            xaxis_title="ms since start",
+            margin=dict(l=10, r=10, t=30, b=10),
+        )
+        st.plotly_chart(fig, use_container_width=True)
+        st.dataframe(
+            df[["name", "start_ms", "duration_ms", "requests", "response_bytes", "thread"]],
+            use_container_width=True, hide_index=True
+        )
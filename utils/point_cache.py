@@ -0,0 +1,101 @@
+import os
+import json
+import hashlib
+import pandas as pd
+from datetime import date, timedelta
+from utils.config import CACHE_DIR
+
+
+POINT_CACHE_DIR = os.path.join(CACHE_DIR, "point_series")
+
+# A dekad is only cached once its window closed this many days ago;
+# Sentinel-1 GRD scenes can still be ingested for a few days after acquisition.
+SETTLE_DAYS = 7
+
+COLUMNS = ["time", "point_id", "mRVI_median"]
+
+
+def empty_frame():
+    return pd.DataFrame({
+        "time": pd.Series(dtype="datetime64[ns]"),
+        "point_id": pd.Series(dtype="object"),
+        "mRVI_median": pd.Series(dtype="float64"),
+    })
+
+
+def cache_key(points_asset, aoi_path, polarization, lee_radius, enl):
+    """Stable key for one points asset sampled over one AOI with one filter setting."""
+    raw = json.dumps([points_asset, aoi_path, polarization, int(lee_radius), float(enl)])
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+def _paths(key):
+    return (
+        os.path.join(POINT_CACHE_DIR, f"{key}.parquet"),
+        os.path.join(POINT_CACHE_DIR, f"{key}_dekads.parquet"),
+    )
+
+
+def load(key):
+    """Return (cached rows, set of settled dekad dates already sampled)."""
+    values_path, dekads_path = _paths(key)
+    if not (os.path.exists(values_path) and os.path.exists(dekads_path)):
+        return empty_frame(), set()
+
+    df = pd.read_parquet(values_path)
+    dekads = set(pd.to_datetime(pd.read_parquet(dekads_path)["dekad"]).dt.date)
+    return df, dekads
+
+
+def save(key, df, dekads):
+    """Write rows and the settled-dekad manifest (atomically, one file at a time)."""
+    os.makedirs(POINT_CACHE_DIR, exist_ok=True)
+    values_path, dekads_path = _paths(key)
+
+    df = df[COLUMNS].sort_values(["time", "point_id"]).reset_index(drop=True)
+    manifest = pd.DataFrame({"dekad": pd.to_datetime(sorted(dekads))})
+
+    for frame, path in ((df, values_path), (manifest, dekads_path)):
+        tmp_path = f"{path}.tmp"
+        frame.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+
+def settled_dekads(dekads, start_date, today=None):
+    """
+    Dekads whose full window [dekad, next dekad) lies inside the requested range
+    and closed at least SETTLE_DAYS ago. Only these are safe to cache.
+    The first dekad (if it starts before start_date) and the last one (window cut at end_date) never are.
+    """
+    start = pd.to_datetime(str(start_date)).date()
+    cutoff = (today or date.today()) - timedelta(days=SETTLE_DAYS)
+    return {
+        d for d, next_d in zip(dekads[:-1], dekads[1:])
+        if d >= start and next_d <= cutoff
+    }
+
+
+def plan_fetch(dekads, start_date, end_date, cached_dekads, today=None):
+    """
+    Split the dekads that are not served from cache into contiguous runs.
+    Returns (settled, runs) where each run is a (start, end) date range to re-sample.
+    """
+    start = pd.to_datetime(str(start_date)).date()
+    end = pd.to_datetime(str(end_date)).date()
+    settled = settled_dekads(dekads, start, today)
+
+    runs = []
+    run_first = None
+    for i, d in enumerate(dekads):
+        if d in settled and d in cached_dekads:
+            if run_first is not None:
+                runs.append((max(run_first, start), d))
+                run_first = None
+            continue
+        if run_first is None:
+            run_first = d
+    if run_first is not None:
+        runs.append((max(run_first, start), end))
+
+    # A run that only holds a dekad ending before start_date has nothing to sample
+    return settled, [(a, b) for a, b in runs if a < b]
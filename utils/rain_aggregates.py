@@ -0,0 +1,240 @@
+# Hierarchical month / dekad / day partial aggregates of GPM IMERG precipitation
+import os
+import time
+import threading
+from datetime import date, timedelta
+from functools import lru_cache
+import pandas as pd
+import ee
+from utils import ee_executor
+from utils.boundary import get_sri_lanka_geometry
+
+
+GPM_COLLECTION = "NASA/GPM_L3/IMERG_V07"
+GPM_BAND = "precipitation"
+
+LEVELS = ("month", "dekad", "day")
+# Native IMERG grid (0.1 degree)
+GPM_CRS = "EPSG:4326"
+GPM_CRS_TRANSFORM = [0.1, 0, -180, 0, -0.1, 90]
+
+# How long an AssetStore trusts its asset listing (seconds)
+LISTING_TTL = 600
+
+SUM_BANDS = ["sum", "count"]
+# Fixed-bin histogram of half-hourly rates (mm/hr) carried by stored blocks, for approximate medians.
+# Rates above HIST_MAX are counted in the top bin.
+HIST_MAX = 50.0
+HIST_BINS = 100
+HIST_WIDTH = HIST_MAX / HIST_BINS
+HIST_BANDS = [f"h{i:03d}" for i in range(HIST_BINS)]
+
+
+# ---------------- Block planning ----------------
+def _to_date(d):
+    return pd.to_datetime(str(d)).date()
+
+
+def _next_month(d):
+    return date(d.year + (d.month == 12), d.month % 12 + 1, 1)
+
+
+def _next_dekad(d):
+    """Dekads start on the 1st, 13th and 25th, like the Sentinel-1 dekad mosaics."""
+    if d.day < 13:
+        return d.replace(day=13)
+    if d.day < 25:
+        return d.replace(day=25)
+    return _next_month(d)
+
+
+def block_end(level, start):
+    if level == "month":
+        return _next_month(start)
+    if level == "dekad":
+        return _next_dekad(start)
+    return start + timedelta(days=1)
+
+
+def plan_blocks(start_date, end_date):
+    """
+    Cover [start_date, end_date) with the fewest whole blocks: months where possible,
+    then dekads, then single days at the edges. Returns [(level, block_start), ...].
+    """
+    d, end = _to_date(start_date), _to_date(end_date)
+    blocks = []
+    while d < end:
+        if d.day == 1 and _next_month(d) <= end:
+            level = "month"
+        elif d.day in (1, 13, 25) and _next_dekad(d) <= end:
+            level = "dekad"
+        else:
+            level = "day"
+        blocks.append((level, d))
+        d = block_end(level, d)
+    return blocks
+
+
+# ---------------- Raw blocks ----------------
+def block_image(level, start, histogram=True):
+    """
+    Sum and count of the half-hourly images in one block, plus HIST_BINS histogram counts
+    (bands h000...) if histogram is set, computed from the raw collection.
+    All bands add up across blocks.
+    """
+    images = ee.ImageCollection(GPM_COLLECTION) \
+        .filterDate(start.isoformat(), block_end(level, start).isoformat()) \
+        .select(GPM_BAND)
+
+    bands = [images.sum().rename("sum"), images.count().rename("count")]
+    if histogram:
+        clamped = images.map(lambda img: img.clamp(0, HIST_MAX - HIST_WIDTH / 2))
+        bands.append(clamped.reduce(ee.Reducer.fixedHistogram(0, HIST_MAX, HIST_BINS))
+                     .arraySlice(1, 1, 2).arrayProject([0]).arrayFlatten([HIST_BANDS]))
+    return ee.Image.cat(bands).toFloat()
+
+
+# ---------------- Stores ----------------
+class MemoryStore:
+    """In-process store of block images, a stand-in for AssetStore (tests, local runs)."""
+
+    def __init__(self):
+        self.blocks = {}
+
+    def get(self, level, start):
+        return self.blocks.get((level, start))
+
+    def put(self, level, start, image):
+        self.blocks[(level, start)] = image
+
+
+class AssetStore:
+    """Block images exported as assets under root, named gpm_<level>_<YYYYMMDD>."""
+
+    def __init__(self, root):
+        self.root = root.rstrip("/")
+        self._names = None
+        self._listed_at = 0.0
+        self._lock = threading.Lock()
+
+    def asset_id(self, level, start):
+        return f"{self.root}/gpm_{level}_{start:%Y%m%d}"
+
+    def _existing(self):
+        with self._lock:
+            if self._names is None or time.monotonic() - self._listed_at > LISTING_TTL:
+                names, token = set(), None
+                while True:
+                    params = {"parent": self.root}
+                    if token:
+                        params["pageToken"] = token
+                    page = ee_executor.call_with_retries(ee.data.listAssets, params)
+                    names.update(a["name"].rsplit("/", 1)[-1] for a in page.get("assets", []))
+                    token = page.get("nextPageToken")
+                    if not token:
+                        break
+                self._names, self._listed_at = names, time.monotonic()
+            return self._names
+
+    def get(self, level, start):
+        asset_id = self.asset_id(level, start)
+        if asset_id.rsplit("/", 1)[-1] in self._existing():
+            return ee.Image(asset_id)
+        return None
+
+    def put(self, level, start, image):
+        """Start an export task for the block; it becomes visible after the task finishes."""
+        task = ee.batch.Export.image.toAsset(
+            image=image,
+            description=f"gpm_{level}_{start:%Y%m%d}",
+            assetId=self.asset_id(level, start),
+            region=get_sri_lanka_geometry().bounds(),
+            crs=GPM_CRS,
+            crsTransform=GPM_CRS_TRANSFORM,
+            maxPixels=1e10,
+        )
+        task.start()
+        return task
+
+
+@lru_cache(maxsize=None)
+def _asset_store(root):
+    return AssetStore(root)
+
+
+def default_store():
+    """
+    AssetStore under RICEWATER_RAIN_AGGREGATES if set, else None (aggregate from raw images).
+    One store per root for the whole process, so its asset listing is shared between calls.
+    """
+    root = os.environ.get("RICEWATER_RAIN_AGGREGATES")
+    return _asset_store(root) if root else None
+
+
+# ---------------- Aggregation ----------------
+def aggregate(start_date, end_date, store, histogram=False):
+    """
+    Image with "sum" and "count" bands over [start_date, end_date), plus the histogram
+    bands (needed by median_image) if histogram is set.
+    Stored blocks are used where available; missing ones fall back to the raw collection.
+    """
+    bands = SUM_BANDS + (HIST_BANDS if histogram else [])
+    parts = []
+    for level, start in plan_blocks(start_date, end_date):
+        image = store.get(level, start) if store is not None else None
+        parts.append(image.select(bands) if image is not None else block_image(level, start, histogram))
+    if not parts:
+        return ee.Image.constant([0] * len(bands)).rename(bands).toFloat()
+    return ee.ImageCollection(parts).sum()
+
+
+# ---------------- Statistics from aggregates ----------------
+def mean_image(aggregated):
+    """Mean half-hourly rate: total sum / total count (same images as the exact mean)."""
+    count = aggregated.select("count")
+    return aggregated.select("sum").divide(count).updateMask(count.gt(0)).rename(GPM_BAND)
+
+
+def median_image(aggregated):
+    """
+    Median half-hourly rate from the summed histograms: centre of the first bin whose
+    cumulative count reaches half the total. Within HIST_WIDTH / 2 of the exact median
+    (the lower middle value for an even count), for medians below HIST_MAX.
+    """
+    count = aggregated.select("count")
+    cumulative = aggregated.select(HIST_BANDS).toArray().arrayAccum(0, ee.Reducer.sum())
+    median_bin = cumulative.gte(count.divide(2)).arrayArgmax().arrayGet([0])
+    return median_bin.add(0.5).multiply(HIST_WIDTH).updateMask(count.gt(0)).rename(GPM_BAND)
+
+
+def error_bound(aggregation):
+    """Largest difference (mm/hr) between the approximate and exact statistic."""
+    if aggregation == "Median":
+        return HIST_WIDTH / 2
+    return 0.0
+
+
+def materialize(store, start_date, end_date, levels=LEVELS):
+    """
+    Write every whole block of the given levels inside [start_date, end_date) that the store lacks.
+    Stored blocks always carry the histogram bands, so they can serve medians later.
+    Run it through `batch_runner.py --materialize-rain START END`.
+    Returns the list of (level, block_start) written (or submitted, for an AssetStore).
+    """
+    start, end = _to_date(start_date), _to_date(end_date)
+    written = []
+    for level in levels:
+        d = start
+        while d < end:
+            if level == "month" and d.day != 1:
+                d = _next_month(d)
+                continue
+            if level == "dekad" and d.day not in (1, 13, 25):
+                d = _next_dekad(d)
+                continue
+            next_d = block_end(level, d)
+            if next_d <= end and store.get(level, d) is None:
+                store.put(level, d, block_image(level, d))
+                written.append((level, d))
+            d = next_d
+    return written
@@ -0,0 +1,198 @@
+import os
+import math
+import hashlib
+import tempfile
+import numpy as np
+import rasterio
+import rasterio.shutil
+from rasterio.transform import from_origin
+from rasterio.windows import Window
+from datetime import date, timedelta
+from itertools import islice
+from concurrent.futures import FIRST_COMPLETED, TimeoutError, wait
+import pandas as pd
+import ee
+from utils import ee_executor, tracing
+from utils.config import CACHE_DIR
+from utils.point_cache import SETTLE_DAYS
+
+
+RASTER_CACHE_DIR = os.path.join(CACHE_DIR, "rasters")
+
+# Output grid: 10 m pixels in UTM 44N (covers Sri Lanka), fetched in TILE_SIZE x TILE_SIZE chunks
+CRS = "EPSG:32644"
+SCALE = 10
+TILE_SIZE = 512
+
+BANDS = ["paddy", "start_month", "start_mmdd"]
+
+# Tiles submitted to the EE executor at once: enough to keep every worker busy
+MAX_TILES_IN_FLIGHT = 2 * ee_executor.MAX_CONCURRENT_REQUESTS
+
+
+def raster_key(image):
+    """Key a raster by its serialized EE graph: same inputs, same file."""
+    return hashlib.sha1(image.serialize().encode()).hexdigest()[:16]
+
+
+def is_settled(end_date, today=None):
+    """
+    True when the mapped window closed at least SETTLE_DAYS ago, so late Sentinel-1 scenes
+    can no longer change the rasters (the same rule point_cache applies per dekad).
+    """
+    cutoff = (today or date.today()) - timedelta(days=SETTLE_DAYS)
+    return pd.to_datetime(str(end_date)).date() <= cutoff
+
+
+def paddy_image(maskedPaddyClassification, maskedStartMonth, maskedStartMonthDay):
+    """Stack the three paddy outputs into one uint16 image; masked pixels become 0."""
+    return ee.Image.cat([
+        maskedPaddyClassification.unmask(0),
+        maskedStartMonth.unmask(0),
+        maskedStartMonthDay.unmask(0),
+    ]).rename(BANDS).toUint16()
+
+
+# ---------------- Fetch layer ----------------
+def ee_fetch_tile(image, grid):
+    """Default fetch layer: one ee.data.computePixels request, returned as a (bands, h, w) array."""
+    data = ee_executor.call_with_retries(ee.data.computePixels, {
+        "expression": image,
+        "fileFormat": "NUMPY_NDARRAY",
+        "grid": grid,
+    })
+    tracing.record_request(data)
+    return np.stack([data[band] for band in BANDS])
+
+
+def tile_grids(bounds, scale=SCALE, tile_size=TILE_SIZE, crs=CRS):
+    """
+    Split (xmin, ymin, xmax, ymax) bounds (in crs units) into pixel grids for computePixels.
+    Returns (width, height, [(Window, grid), ...]).
+    """
+    xmin, ymin, xmax, ymax = bounds
+    width = math.ceil((xmax - xmin) / scale)
+    height = math.ceil((ymax - ymin) / scale)
+
+    tiles = []
+    for row in range(0, height, tile_size):
+        for col in range(0, width, tile_size):
+            w, h = min(tile_size, width - col), min(tile_size, height - row)
+            grid = {
+                "dimensions": {"width": w, "height": h},
+                "affineTransform": {
+                    "scaleX": scale, "shearX": 0, "translateX": xmin + col * scale,
+                    "shearY": 0, "scaleY": -scale, "translateY": ymax - row * scale,
+                },
+                "crsCode": crs,
+            }
+            tiles.append((Window(col, row, w, h), grid))
+    return width, height, tiles
+
+
+def aoi_bounds(aoi, crs=CRS):
+    """AOI bounding box in the output CRS."""
+    ring = ee_executor.get_info(aoi.bounds(1, crs).coordinates())[0]
+    xs, ys = [p[0] for p in ring], [p[1] for p in ring]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+# ---------------- Export ----------------
+def _write_tiles(dst, image, tiles, fetch_tile):
+    """
+    Fetch tiles through the EE executor and write each one as soon as it arrives.
+    At most MAX_TILES_IN_FLIGHT are submitted at a time, so memory and the executor queue stay
+    bounded however large the AOI is. No tile may take longer than REQUEST_TIMEOUT after the
+    previous one arrived.
+    """
+    queued = iter(tiles)
+    pending = {}
+    try:
+        while True:
+            for window, grid in islice(queued, MAX_TILES_IN_FLIGHT - len(pending)):
+                pending[ee_executor.submit(fetch_tile, image, grid)] = window
+            if not pending:
+                return
+            done, _ = wait(pending, timeout=ee_executor.REQUEST_TIMEOUT, return_when=FIRST_COMPLETED)
+            if not done:
+                raise TimeoutError(f"no tile arrived within {ee_executor.REQUEST_TIMEOUT} s")
+            for future in done:
+                dst.write(future.result().astype(np.uint16), window=pending.pop(future))
+    finally:
+        # In-flight tiles of a failed export are dropped instead of keeping the pool busy
+        for future in pending:
+            future.cancel()
+
+
+def export_paddy_rasters(aoi, maskedPaddyClassification, maskedStartMonth, maskedStartMonthDay,
+                         end_date=None, fetch_tile=ee_fetch_tile, bounds=None, today=None):
+    """
+    Pull the paddy outputs for the AOI into a local Cloud-Optimized GeoTIFF (once per image graph).
+    Rasters whose window ends after the SETTLE_DAYS cutoff (or with no end_date given) are
+    re-exported on every call instead of being reused.
+    Tiles are fetched in parallel through fetch_tile(image, grid); pass a stand-in to run without EE.
+    Returns the COG path.
+    """
+    image = paddy_image(maskedPaddyClassification, maskedStartMonth, maskedStartMonthDay)
+    settled = end_date is not None and is_settled(end_date, today)
+    path = os.path.join(RASTER_CACHE_DIR, f"{raster_key(image)}{'' if settled else '.unsettled'}.tif")
+    if settled and os.path.exists(path):
+        return path
+
+    os.makedirs(RASTER_CACHE_DIR, exist_ok=True)
+    bounds = bounds or aoi_bounds(aoi)
+    width, height, tiles = tile_grids(bounds)
+
+    profile = {
+        "driver": "GTiff", "dtype": "uint16", "count": len(BANDS),
+        "width": width, "height": height, "crs": CRS,
+        "transform": from_origin(bounds[0], bounds[3], SCALE, SCALE),
+        "tiled": True, "blockxsize": TILE_SIZE, "blockysize": TILE_SIZE,
+        "compress": "deflate", "nodata": 0,
+    }
+
+    # Temp files per write: sessions exporting the same raster at once never share one
+    tmp_paths = []
+    for suffix in (".part.tif", ".cog.tif"):
+        with tempfile.NamedTemporaryFile(dir=RASTER_CACHE_DIR, suffix=suffix, delete=False) as tmp:
+            tmp_paths.append(tmp.name)
+    part_path, cog_path = tmp_paths
+    try:
+        with rasterio.open(part_path, "w", **profile) as dst:
+            _write_tiles(dst, image, tiles, fetch_tile)
+            for i, band in enumerate(BANDS, start=1):
+                dst.set_band_description(i, band)
+
+        rasterio.shutil.copy(part_path, cog_path, driver="COG", compress="deflate", blocksize=TILE_SIZE)
+        os.replace(cog_path, path)
+    finally:
+        for tmp_path in tmp_paths:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return path
+
+
+# ---------------- Local statistics ----------------
+def local_statistics(path):
+    """
+    Same outputs as gee_helpers.compute_statistics from a cached COG, using windowed reads.
+    Returns (total_area_ha, month_stats, mmdd_stats).
+    """
+    total_pixels = 0
+    month_counts = np.zeros(13, dtype=np.int64)
+    mmdd_counts = np.zeros(1232, dtype=np.int64)
+
+    with rasterio.open(path) as src:
+        pixel_area_ha = abs(src.transform.a * src.transform.e) / 10000
+
+        for _, window in src.block_windows(1):
+            paddy, month, mmdd = src.read([1, 2, 3], window=window)
+            is_paddy = paddy > 0
+            total_pixels += int(is_paddy.sum())
+            month_counts += np.bincount(month[is_paddy], minlength=13)[:13]
+            mmdd_counts += np.bincount(mmdd[is_paddy], minlength=1232)[:1232]
+
+    # Group 0 (no start date) only counts towards the total
+    month_stats = {int(m): float(month_counts[m] * pixel_area_ha) for m in np.flatnonzero(month_counts[1:]) + 1}
+    mmdd_stats = {int(d): float(mmdd_counts[d] * pixel_area_ha) for d in np.flatnonzero(mmdd_counts[1:]) + 1}
+    return total_pixels * pixel_area_ha, month_stats, mmdd_stats
@@ -2,49 +2,27 @@
 import ee
 import streamlit as st
 import pandas as pd
-from utils.config import load_assets
+from utils import tracing
+from utils.config import DEFAULT_SCHEME, load_assets
+from utils.dekad_stats import DekadStats
+from utils.dekad_pipeline import dekad_dates
 
-def detect_outliers(df_points, dates):
-    df_points["time"] = pd.to_datetime(df_points["time"])
-
-    start_date = pd.to_datetime(dates["start"])
-    peak_date = pd.to_datetime(dates["peak"])
-    harvest_date = pd.to_datetime(dates["harvest"])
-
-    # Subset values
-    start_values = df_points[df_points["time"] == start_date]["mRVI_median"]
-    peak_values = df_points[df_points["time"] == peak_date]["mRVI_median"]
-    harvest_values = df_points[df_points["time"] == harvest_date]["mRVI_median"]
-
-    # Quartiles
-    q3_start = start_values.quantile(0.75)
-    q1_peak = peak_values.quantile(0.25)
-
-    # Mean values
-    mean_start = start_values.mean()
-    mean_peak = peak_values.mean()
-    mean_harvest = harvest_values.mean()
 
-    # Differences
-    diff_start_peak = mean_peak - mean_start
-    diff_peak_harvest = mean_peak - mean_harvest
+# Date ranges with more dekads than this use the array-based streak (List.iterate gets too deep)
+ARRAY_STREAK_MIN_DEKADS = 18
 
-    results = {
-        "q3_start": q3_start,
-        "q1_peak": q1_peak,
-        "mean_start": mean_start,
-        "mean_peak": mean_peak,
-        "mean_harvest": mean_harvest,
-        "diff_start_peak": diff_start_peak,
-        "diff_peak_harvest": diff_peak_harvest
-    }
-
-    return results
+@tracing.traced()
+def detect_outliers(df_points, dates):
+    """Quartile and mean thresholds at the season's start, peak and harvest dekads (see DekadStats)."""
+    df_points["time"] = pd.to_datetime(df_points["time"])
+    return DekadStats(df_points).outlier_params(dates["start"], dates["peak"], dates["harvest"])
 
-def perform_rice_mapping(aoi, mosaicCollectionUInt16, filteredDekadList, outlier_params, dates):
-    """Perform rice mapping using mRVI temporal logic."""
+@tracing.traced()
+def perform_rice_mapping(aoi, mosaicCollectionUInt16, filteredDekadList, outlier_params, dates, streak_method="iterate",
+                         scheme=DEFAULT_SCHEME):
+    """Perform rice mapping using mRVI temporal logic (roads and water masks from the scheme's assets)."""
 
-    assets = load_assets()
+    assets = load_assets(scheme)
     roads = assets["roads"]
     water = assets["water"]
 
@@ -149,6 +127,51 @@ def perform_rice_mapping(aoi, mosaicCollectionUInt16, filteredDekadList, outlier
     maskedPaddyClassification = cleaned_paddy.updateMask(eraseMask.Not()).rename('masked_paddy_classified')
     maskedPaddyClassification = maskedPaddyClassification.updateMask(maskedPaddyClassification.gt(0))
 
+    # ---------------- Sequential growth & longest streak ----------------
+    sequentialImgs = sequential_growth_images(mosaicCollectionUInt16)
+    finalLongest, finalStartDate, finalStartMonth, finalStartMonthDay = longest_streak_images(
+        sequentialImgs, aoi, method=streak_method
+    )
+
+    # Mask to paddy and remove zeros
+    maskedLongest = finalLongest.updateMask(maskedPaddyClassification).updateMask(finalLongest.neq(0))
+    maskedStartDate = finalStartDate.updateMask(maskedPaddyClassification).updateMask(finalStartDate.neq(0))
+    maskedStartMonth = finalStartMonth.updateMask(maskedPaddyClassification).updateMask(finalStartMonth.neq(0))
+    maskedStartMonthDay = finalStartMonthDay.updateMask(maskedPaddyClassification).updateMask(finalStartMonthDay.neq(0))
+
+    # ---------------- Create Growing Season map ----------------
+    stats = maskedStartDate.reduceRegion(
+        reducer=ee.Reducer.minMax(),
+        geometry=aoi,
+        scale=10,
+        maxPixels=1e9,
+        bestEffort=True
+    )
+
+    minValue = ee.Number(stats.get('Longest_Streak_Start_min'))
+    maxValue = ee.Number(stats.get('Longest_Streak_Start_max'))
+
+    # --- Define thresholds to split into 3 classes ---
+    earlySeasonThreshold = minValue.add(maxValue.subtract(minValue).multiply(0.33))
+    midSeasonThreshold = minValue.add(maxValue.subtract(minValue).multiply(0.66))
+
+    # --- Classify into 3 growing season classes ---
+    growingSeason = maskedStartDate.expression(
+        "(b('Longest_Streak_Start') <= early) ? 0" +
+        ": (b('Longest_Streak_Start') > early && b('Longest_Streak_Start') <= mid) ? 1" +
+        ": 2",
+        {
+            'early': earlySeasonThreshold,
+            'mid': midSeasonThreshold
+        }
+    ).updateMask(maskedPaddyClassification)
+
+    return maskedPaddyClassification, growingSeason, maskedStartMonth, maskedStartMonthDay
+
+
+@tracing.traced()
+def sequential_growth_images(mosaicCollectionUInt16):
+    """Per-dekad 0/1 images marking two consecutive mRVI increases, with start_time/end_time properties."""
     # ---------------- Get differences ----------------
     def calculateDifference(prevImage, nextImage):
         diff = nextImage.subtract(prevImage)
@@ -214,18 +237,12 @@ def perform_rice_mapping(aoi, mosaicCollectionUInt16, filteredDekadList, outlier
             .set('start_time', ee.Number(img.get('start_time'))) \
             .set('end_time', ee.Number(img.get('end_time')))
 
-    sequentialImgs = sequentialDiffs.map(func_wun)
+    return sequentialDiffs.map(func_wun)
 
-    imgList = sequentialImgs.toList(sequentialImgs.size())
 
-    # ---------------- Track start date of the longest streak ----------------
-    # Initial dictionary for iterate
-    init = ee.Dictionary({
-        'currentLength': ee.Image(0),
-        'longestLength': ee.Image(0),
-        'currentStartDate': ee.Image(0),
-        'longestStartDate': ee.Image(0)
-    })
+def _longest_streak_iterate(sequentialImgs, aoi):
+    """Fold the growth images one dekad at a time (graph depth grows with the number of dekads)."""
+    imgList = sequentialImgs.toList(sequentialImgs.size())
 
     def func_hxg(imgObj, prev):
         img = ee.Image(imgObj).clip(aoi)
@@ -301,6 +318,7 @@ def perform_rice_mapping(aoi, mosaicCollectionUInt16, filteredDekadList, outlier
             'longestStartMonthDay': newLongestStartMonthDay
         })
 
+    # Initial dictionary for iterate
     init = ee.Dictionary({
         'currentLength': ee.Image(0),
         'longestLength': ee.Image(0),
@@ -316,43 +334,69 @@ def perform_rice_mapping(aoi, mosaicCollectionUInt16, filteredDekadList, outlier
     result = imgList.iterate(func_hxg, init)
     final = ee.Dictionary(result)
 
-    # Final maps
-    finalLongest = ee.Image(final.get('longestLength')).clip(aoi).rename('Longest_Streak')
-    finalStartDate = ee.Image(final.get('longestStartDate')).clip(aoi).rename('Longest_Streak_Start')
-    finalStartMonth = ee.Image(final.get('longestStartMonth')).clip(aoi).rename('Longest_Streak_Start_MM')
-    finalStartMonthDay = ee.Image(final.get('longestStartMonthDay')).clip(aoi).rename('Longest_Streak_Start_MMDD')
+    return (
+        ee.Image(final.get('longestLength')),
+        ee.Image(final.get('longestStartDate')),
+        ee.Image(final.get('longestStartMonth')),
+        ee.Image(final.get('longestStartMonthDay'))
+    )
 
-    # Mask to paddy and remove zeros
-    maskedLongest = finalLongest.updateMask(maskedPaddyClassification).updateMask(finalLongest.neq(0))
-    maskedStartDate = finalStartDate.updateMask(maskedPaddyClassification).updateMask(finalStartDate.neq(0))
-    maskedStartMonth = finalStartMonth.updateMask(maskedPaddyClassification).updateMask(finalStartMonth.neq(0))
-    maskedStartMonthDay = finalStartMonthDay.updateMask(maskedPaddyClassification).updateMask(finalStartMonthDay.neq(0))
 
-    # ---------------- Create Growing Season map ----------------
-    stats = maskedStartDate.reduceRegion(
-        reducer=ee.Reducer.minMax(),
-        geometry=aoi,
-        scale=10,
-        maxPixels=1e9,
-        bestEffort=True
+def _longest_streak_array(sequentialImgs):
+    """
+    Same outputs as _longest_streak_iterate from per-pixel arrays, in a graph of fixed depth.
+    Run lengths are a cumulative sum reset at each gap; arrayArgmax gives the first (earliest) longest run.
+    """
+    startTimes = sequentialImgs.aggregate_array('start_time')
+    startMonths = startTimes.map(lambda t: ee.Date(t).get('month'))
+    startMonthDays = startTimes.map(
+        lambda t: ee.Number(ee.Date(t).get('month')).multiply(100).add(ee.Date(t).get('day'))
     )
 
-    minValue = ee.Number(stats.get('Longest_Streak_Start_min'))
-    maxValue = ee.Number(stats.get('Longest_Streak_Start_max'))
+    # Growth flags as a 1-D array along time (masked pixels -> 0 so positions stay aligned)
+    growth = sequentialImgs.map(lambda img: img.unmask(0).eq(1)).toArray().arrayProject([0])
 
-    # --- Define thresholds to split into 3 classes ---
-    earlySeasonThreshold = minValue.add(maxValue.subtract(minValue).multiply(0.33))
-    midSeasonThreshold = minValue.add(maxValue.subtract(minValue).multiply(0.66))
+    counts = growth.arrayAccum(0, ee.Reducer.sum())
+    lastReset = growth.eq(0).multiply(counts).arrayAccum(0, ee.Reducer.max())
+    runs = counts.subtract(lastReset)
 
-    # --- Classify into 3 growing season classes ---
-    growingSeason = maskedStartDate.expression(
-        "(b('Longest_Streak_Start') <= early) ? 0" +
-        ": (b('Longest_Streak_Start') > early && b('Longest_Streak_Start') <= mid) ? 1" +
-        ": 2",
-        {
-            'early': earlySeasonThreshold,
-            'mid': midSeasonThreshold
-        }
-    ).updateMask(maskedPaddyClassification)
+    longestLength = runs.arrayReduce(ee.Reducer.max(), [0]).arrayGet([0])
+    endIndex = runs.arrayArgmax().arrayGet([0])
+    startIndex = endIndex.subtract(longestLength).add(1)
 
-    return maskedPaddyClassification, growingSeason, maskedStartMonth, maskedStartMonthDay
+    # One-hot of the start position picks the matching start time / month / MMDD
+    positions = ee.Image(ee.Array(ee.List.sequence(0, startTimes.size().subtract(1))))
+    isStart = positions.eq(startIndex)
+    hasStreak = longestLength.gt(0)
+
+    def pick(values):
+        return ee.Image(ee.Array(values)).multiply(isStart) \
+            .arrayReduce(ee.Reducer.sum(), [0]).arrayGet([0]) \
+            .multiply(hasStreak)
+
+    return longestLength, pick(startTimes), pick(startMonths), pick(startMonthDays)
+
+
+@tracing.traced()
+def longest_streak_images(sequentialImgs, aoi, method="iterate"):
+    """
+    Longest growth streak length and its start (millis, month, MMDD), clipped to the AOI.
+    method="iterate" folds with List.iterate; method="array" uses array operators (fixed graph depth).
+    """
+    if method == "array":
+        longest, startDate, startMonth, startMonthDay = _longest_streak_array(sequentialImgs)
+    else:
+        longest, startDate, startMonth, startMonthDay = _longest_streak_iterate(sequentialImgs, aoi)
+
+    # Final maps
+    finalLongest = longest.clip(aoi).rename('Longest_Streak')
+    finalStartDate = startDate.clip(aoi).rename('Longest_Streak_Start')
+    finalStartMonth = startMonth.clip(aoi).rename('Longest_Streak_Start_MM')
+    finalStartMonthDay = startMonthDay.clip(aoi).rename('Longest_Streak_Start_MMDD')
+
+    return finalLongest, finalStartDate, finalStartMonth, finalStartMonthDay
+
+
+def streak_method_for(start_date, end_date):
+    """Use the fixed-depth array streak for ranges longer than ARRAY_STREAK_MIN_DEKADS."""
+    return "array" if len(dekad_dates(start_date, end_date)) > ARRAY_STREAK_MIN_DEKADS else "iterate"
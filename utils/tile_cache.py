@@ -0,0 +1,63 @@
+import json
+import time
+import hashlib
+import threading
+import folium
+from utils import ee_executor
+
+
+# Earth Engine map ids stay valid for several hours; refresh well before that
+TILE_URL_TTL = 4 * 3600
+MAX_ENTRIES = 256
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def tile_key(image, vis_params):
+    """Key a tile layer by its serialized EE graph and vis params."""
+    raw = image.serialize() + json.dumps(vis_params or {}, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _evict(now):
+    for key in [k for k, (expires, _) in _cache.items() if expires <= now]:
+        del _cache[key]
+    while len(_cache) >= MAX_ENTRIES:
+        del _cache[min(_cache, key=lambda k: _cache[k][0])]
+
+
+def get_tile_url(image, vis_params=None):
+    """
+    XYZ tile URL template for an ee.Image, shared by all sessions.
+    Only the first request for a given graph + vis params (or one past TILE_URL_TTL) calls getMapId.
+    """
+    key = tile_key(image, vis_params)
+    now = time.monotonic()
+    with _lock:
+        hit = _cache.get(key)
+        if hit and hit[0] > now:
+            return hit[1]
+
+    # Counted as a request by the tracing hook on ee.data.getMapId
+    map_id = ee_executor.call_with_retries(image.getMapId, vis_params or {})
+    url = map_id["tile_fetcher"].url_format
+
+    with _lock:
+        _evict(now)
+        _cache[key] = (now + TILE_URL_TTL, url)
+    return url
+
+
+def add_ee_tile_layer(map_obj, image, vis_params, name, shown=True, opacity=1.0):
+    """Add an ee.Image to a folium map as a TileLayer using the cached tile URL."""
+    folium.TileLayer(
+        tiles=get_tile_url(image, vis_params),
+        name=name,
+        attr="Google Earth Engine",
+        overlay=True,
+        control=True,
+        show=shown,
+        opacity=opacity,
+    ).add_to(map_obj)
+    return map_obj
@@ -0,0 +1,216 @@
+import os
+import json
+import time
+import threading
+import contextvars
+from datetime import datetime, timezone
+from contextlib import contextmanager
+from functools import wraps
+import numpy as np
+from utils.config import CACHE_DIR
+
+
+# One JSON line per finished trace; rotated to traces.jsonl.1 ... .N past TRACE_LOG_MAX_BYTES
+TRACE_LOG = os.environ.get("RICEWATER_TRACE_LOG", os.path.join(CACHE_DIR, "traces.jsonl"))
+TRACE_LOG_MAX_BYTES = 10 * 2 ** 20
+TRACE_LOG_BACKUPS = 3
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+_log_lock = threading.Lock()
+_hooks_lock = threading.Lock()
+_ee_hook_users = 0
+_restore_ee_hooks = None
+
+
+class Span:
+    """One timed stage. Request counts and bytes include those of nested spans."""
+
+    def __init__(self, name, trace, parent=None):
+        self.name = name
+        self.trace = trace
+        self.parent = parent
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.thread = threading.current_thread().name
+        self.start = time.perf_counter()
+        self.end = None
+        self.requests = 0
+        self.response_bytes = 0
+        trace.add(self)
+
+    def finish(self):
+        self.end = time.perf_counter()
+
+    def to_dict(self):
+        end = self.end if self.end is not None else time.perf_counter()
+        return {
+            "name": self.name,
+            "depth": self.depth,
+            "parent": self.parent.name if self.parent else None,
+            "thread": self.thread,
+            "start_ms": round((self.start - self.trace.start) * 1000, 3),
+            "duration_ms": round((end - self.start) * 1000, 3),
+            "requests": self.requests,
+            "response_bytes": self.response_bytes,
+        }
+
+
+class Trace:
+    """All spans recorded under one trace() block."""
+
+    def __init__(self, name):
+        self.name = name
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self.start = time.perf_counter()
+        self.spans = []
+        self.lock = threading.Lock()
+
+    def add(self, span):
+        with self.lock:
+            self.spans.append(span)
+
+    def to_dict(self):
+        with self.lock:
+            spans = [s.to_dict() for s in self.spans]
+        return {"trace": self.name, "started_at": self.started_at, "spans": spans}
+
+
+def _rotate(log_path, backups=TRACE_LOG_BACKUPS):
+    """log -> log.1 -> ... -> log.<backups>; the oldest is dropped."""
+    for i in range(backups - 1, 0, -1):
+        if os.path.exists(f"{log_path}.{i}"):
+            os.replace(f"{log_path}.{i}", f"{log_path}.{i + 1}")
+    if backups > 0:
+        os.replace(log_path, f"{log_path}.1")
+    else:
+        os.remove(log_path)
+
+
+def _write_log(trace, log_path):
+    line = json.dumps(trace.to_dict())
+    with _log_lock:
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        if os.path.exists(log_path) and os.path.getsize(log_path) + len(line) + 1 > TRACE_LOG_MAX_BYTES:
+            _rotate(log_path)
+        with open(log_path, "a") as f:
+            f.write(line + "\n")
+
+
+def _install_ee_hooks():
+    import ee
+    from googleapiclient import model
+
+    get_map_id = ee.data.getMapId
+    deserialize = model.JsonModel.deserialize
+
+    @wraps(get_map_id)
+    def counted_get_map_id(*args, **kwargs):
+        map_id = get_map_id(*args, **kwargs)
+        record_request(map_id.get("mapid"))
+        return map_id
+
+    @wraps(deserialize)
+    def timed_deserialize(self, content):
+        with span("ee.parse_json"):
+            return deserialize(self, content)
+
+    ee.data.getMapId = counted_get_map_id
+    model.JsonModel.deserialize = timed_deserialize
+
+    def restore():
+        ee.data.getMapId = get_map_id
+        model.JsonModel.deserialize = deserialize
+    return restore
+
+
+@contextmanager
+def ee_hooks():
+    """
+    While active, count every ee.data.getMapId call as a request, including the ones geemap makes
+    in addLayer, and time the JSON decoding of every Earth Engine response as an "ee.parse_json"
+    span. The patches are shared by overlapping traces (one per session) and the original
+    functions are restored when the last of them ends.
+    """
+    global _ee_hook_users, _restore_ee_hooks
+    with _hooks_lock:
+        if _ee_hook_users == 0:
+            _restore_ee_hooks = _install_ee_hooks()
+        _ee_hook_users += 1
+    try:
+        yield
+    finally:
+        with _hooks_lock:
+            _ee_hook_users -= 1
+            if _ee_hook_users == 0:
+                _restore_ee_hooks()
+                _restore_ee_hooks = None
+
+
+@contextmanager
+def trace(name, log_path=TRACE_LOG):
+    """Start a trace; spans opened inside (also on ee_executor threads) are attached to it."""
+    t = Trace(name)
+    root = Span(name, t)
+    token = _current_span.set(root)
+    try:
+        with ee_hooks():
+            yield t
+    finally:
+        root.finish()
+        _current_span.reset(token)
+        # Reruns that ran no traced stage are not logged
+        if log_path and len(t.spans) > 1:
+            _write_log(t, log_path)
+
+
+@contextmanager
+def span(name):
+    """Time a stage inside the current trace; does nothing when no trace is active."""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    s = Span(name, parent.trace, parent)
+    token = _current_span.set(s)
+    try:
+        yield s
+    finally:
+        s.finish()
+        _current_span.reset(token)
+
+
+def traced(name=None):
+    """Decorator form of span(); the span name defaults to module.function."""
+    def decorator(fn):
+        span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _payload_size(response):
+    """Approximate response size: array bytes, string length, or the JSON length of decoded results."""
+    if isinstance(response, np.ndarray):
+        return response.nbytes
+    if isinstance(response, (str, bytes)):
+        return len(response)
+    try:
+        return len(json.dumps(response, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+def record_request(response):
+    """Count one Earth Engine request and its response size on the current span and its parents."""
+    s = _current_span.get()
+    if s is None:
+        return
+    size = _payload_size(response)
+    with s.trace.lock:
+        while s is not None:
+            s.requests += 1
+            s.response_bytes += size
+            s = s.parent
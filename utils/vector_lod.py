@@ -0,0 +1,93 @@
+import math
+from functools import lru_cache
+import numpy as np
+import shapely
+from shapely.geometry import box
+from utils import vector_store
+
+
+# (max zoom, simplify tolerance in degrees, coordinate decimals); deeper zooms get full detail
+ZOOM_LEVELS = [
+    (8, 0.01, 3),
+    (10, 0.002, 4),
+    (12, 0.0005, 5),
+]
+FULL_DETAIL_DECIMALS = 6
+
+# Viewports are snapped outwards to this grid (degrees) so small pans reuse the cached payload
+BBOX_GRID = 0.25
+
+GEOJSON_CACHE_SIZE = 64
+
+
+def level_for_zoom(zoom):
+    """(tolerance, decimals) for a map zoom level."""
+    for max_zoom, tolerance, decimals in ZOOM_LEVELS:
+        if zoom is None or zoom <= max_zoom:
+            return tolerance, decimals
+    return None, FULL_DETAIL_DECIMALS
+
+
+def snap_bounds(bounds):
+    """Round (west, south, east, north) outwards to BBOX_GRID; None stays None (whole layer)."""
+    if bounds is None:
+        return None
+    west, south, east, north = bounds
+    return (
+        math.floor(west / BBOX_GRID) * BBOX_GRID,
+        math.floor(south / BBOX_GRID) * BBOX_GRID,
+        math.ceil(east / BBOX_GRID) * BBOX_GRID,
+        math.ceil(north / BBOX_GRID) * BBOX_GRID,
+    )
+
+
+def lod_key(zoom, bounds):
+    """(detail level, snapped viewport): the vector payloads only change when this does."""
+    return level_for_zoom(zoom), snap_bounds(bounds)
+
+
+def folium_bounds(returned):
+    """(west, south, east, north) from the 'bounds' dict returned by st_folium, or None."""
+    if not returned or not returned.get("_southWest") or returned["_southWest"].get("lat") is None:
+        return None
+    sw, ne = returned["_southWest"], returned["_northEast"]
+    return sw["lng"], sw["lat"], ne["lng"], ne["lat"]
+
+
+def _visible(gdf, bounds, tolerance, decimals, columns=()):
+    if bounds is not None:
+        gdf = gdf.iloc[gdf.sindex.query(box(*bounds), predicate="intersects")]
+    gdf = gdf[list(columns) + ["geometry"]]
+
+    geoms = gdf.geometry.values
+    if tolerance is not None:
+        geoms = shapely.simplify(geoms, tolerance, preserve_topology=True)
+    geoms = shapely.transform(geoms, lambda coords: np.round(coords, decimals))
+    return gdf.set_geometry(geoms)[~shapely.is_empty(geoms)]
+
+
+def lod_frame(gdf, zoom, bounds=None, columns=()):
+    """
+    Features of an EPSG:4326 frame visible in bounds, simplified and quantized for zoom.
+    Only the geometry and the given attribute columns are kept to keep the payload small.
+    """
+    tolerance, decimals = level_for_zoom(zoom)
+    return _visible(gdf, bounds, tolerance, decimals, columns)
+
+
+@lru_cache(maxsize=GEOJSON_CACHE_SIZE)
+def _layer_geojson(data_dir, name, level, bounds):
+    tolerance, decimals = level
+    gdf = vector_store.get_layer(data_dir, name, tolerance)
+    if gdf is None:
+        return None
+    # The store already holds the layer simplified at this tolerance; only filter and quantize
+    return _visible(gdf, bounds, None, decimals).to_json(drop_id=True)
+
+
+def layer_geojson(data_dir, name, zoom, bounds=None):
+    """
+    GeoJSON string of a vector_store layer for the current view, or None if the layer is missing.
+    Payloads are cached per (layer, detail level, snapped viewport).
+    """
+    return _layer_geojson(data_dir, name, level_for_zoom(zoom), snap_bounds(bounds))
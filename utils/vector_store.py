@@ -0,0 +1,64 @@
+import os
+import tempfile
+from functools import lru_cache
+import geopandas as gpd
+from utils.config import CACHE_DIR
+
+
+VECTOR_CACHE_DIR = os.path.join(CACHE_DIR, "vectors")
+
+# Pre-simplified levels in degrees (~50 m, ~200 m, ~1 km)
+SIMPLIFY_TOLERANCES = (0.0005, 0.002, 0.01)
+
+# Layers (name x tolerance) kept in memory for all sessions
+LAYER_CACHE_SIZE = 32
+
+
+def _parquet_path(name, tolerance=None):
+    suffix = "" if tolerance is None else f"_s{tolerance:g}"
+    return os.path.join(VECTOR_CACHE_DIR, f"{name}{suffix}.parquet")
+
+
+def _convert(shp_path, name):
+    """Shapefile -> EPSG:4326 GeoParquet plus one simplified copy per tolerance."""
+    os.makedirs(VECTOR_CACHE_DIR, exist_ok=True)
+    gdf = gpd.read_file(shp_path).to_crs(epsg=4326)
+
+    versions = [(None, gdf)] + [
+        (tol, gdf.assign(geometry=gdf.geometry.simplify(tol, preserve_topology=True)))
+        for tol in SIMPLIFY_TOLERANCES
+    ]
+    for tol, version in versions:
+        path = _parquet_path(name, tol)
+        # A temp file per write: sessions converting the same layer at once never share one
+        with tempfile.NamedTemporaryFile(dir=VECTOR_CACHE_DIR, suffix=".parquet.tmp", delete=False) as tmp:
+            tmp_path = tmp.name
+        try:
+            version.to_parquet(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+@lru_cache(maxsize=LAYER_CACHE_SIZE)
+def _load(shp_path, shp_mtime, tolerance):
+    name = os.path.splitext(os.path.basename(shp_path))[0]
+    path = _parquet_path(name, tolerance)
+    if not os.path.exists(path) or os.path.getmtime(path) < shp_mtime:
+        _convert(shp_path, name)
+    return gpd.read_parquet(path)
+
+
+def get_layer(data_dir, name, tolerance=None):
+    """
+    GeoDataFrame (EPSG:4326) for data_dir/<name>.shp, or None if the shapefile is missing.
+    tolerance picks one of SIMPLIFY_TOLERANCES (None = full detail).
+    The frame is shared between sessions: filter or copy it, never modify it in place.
+    """
+    shp_path = os.path.join(data_dir, f"{name}.shp")
+    if not os.path.exists(shp_path):
+        return None
+    if tolerance is not None and tolerance not in SIMPLIFY_TOLERANCES:
+        raise ValueError(f"tolerance must be one of {SIMPLIFY_TOLERANCES}")
+    return _load(os.path.abspath(shp_path), os.path.getmtime(shp_path), tolerance)
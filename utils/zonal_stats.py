@@ -0,0 +1,69 @@
+import json
+from functools import lru_cache
+import pandas as pd
+import ee
+from utils import ee_executor, rain_aggregates, vector_store
+from utils.config import DATA_DIR
+
+
+# analysis type -> (layer, name field)
+ZONE_LAYERS = {
+    "Administrative": ("lka_dis", "ADM2_EN"),
+    "Hydrological": ("lka_basins", "WSHD_NAME"),
+}
+
+# Zone outlines are far finer than the 0.1 degree GPM grid; the ~200 m simplified copy is plenty
+ZONE_TOLERANCE = 0.002
+# Reduction scale (m): finer than GPM pixels so small zones get area-weighted values
+ZONAL_SCALE = 1000
+
+# Zone reductions of the rainfall accumulated over the date range: reduceRegions output -> column
+COLUMNS = {
+    "volume_sum": "Rainfall volume (m³)",
+    "depth_mean": "Rainfall mean (mm)",
+    "depth_max": "Rainfall max (mm)",
+}
+
+
+@lru_cache(maxsize=len(ZONE_LAYERS))
+def zones_collection(analysis_type, data_dir=DATA_DIR):
+    """Districts or basins as an ee.FeatureCollection with only the name property."""
+    layer, field = ZONE_LAYERS[analysis_type]
+    gdf = vector_store.get_layer(data_dir, layer, ZONE_TOLERANCE)
+    return ee.FeatureCollection(json.loads(gdf[[field, "geometry"]].to_json(drop_id=True)))
+
+
+@lru_cache(maxsize=64)
+def _zonal_rainfall(start, end, analysis_type, data_dir):
+    _, field = ZONE_LAYERS[analysis_type]
+
+    # Sum / count blocks only: the zones never need the median histograms
+    depth = rain_aggregates.aggregate(start, end, rain_aggregates.default_store(), histogram=False) \
+        .select(["sum"], ["depth"])
+    # mm over each cell's area -> m³; summing depths alone would give mm x cells
+    volume = depth.divide(1000).multiply(ee.Image.pixelArea()).rename("volume")
+
+    # Two bands: reduceRegions names the outputs <band>_<reducer> (volume_sum, depth_mean, ...)
+    reducer = ee.Reducer.sum() \
+        .combine(ee.Reducer.mean(), sharedInputs=True) \
+        .combine(ee.Reducer.max(), sharedInputs=True)
+    zones = depth.addBands(volume).reduceRegions(
+        collection=zones_collection(analysis_type, data_dir),
+        reducer=reducer,
+        scale=ZONAL_SCALE,
+    ).select([field] + list(COLUMNS), None, False)
+
+    rows = [f["properties"] for f in ee_executor.get_info(zones)["features"]]
+    df = pd.DataFrame(rows, columns=[field] + list(COLUMNS)).rename(columns=COLUMNS)
+    return df.set_index(field).sort_index()
+
+
+def zonal_rainfall(start_date, end_date, analysis_type, data_dir=DATA_DIR):
+    """
+    Rainfall volume (m³) and mean and max depth (mm) over every district or basin of the
+    rainfall accumulated between the dates, from one reduceRegions request.
+    Tables are cached per date range and zone type.
+    """
+    start = pd.to_datetime(str(start_date)).date().isoformat()
+    end = pd.to_datetime(str(end_date)).date().isoformat()
+    return _zonal_rainfall(start, end, analysis_type, data_dir).copy()